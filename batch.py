@@ -0,0 +1,306 @@
+"""
+program: batch.py
+
+purpose: filter csv datasets and compute their statistics without the UI,
+         e.g. in a nightly pipeline.
+
+comments: Each csv file is read in chunks; matching rows are written to
+          the output file as each chunk is filtered, so a file need not fit
+          in memory. The statistics table is for the matching rows: moments
+          are merged over chunks, and the median takes two more passes over
+          the statistics columns (see stats_engine.ChunkedMedian). Files
+          are processed in parallel, one per worker process.
+
+          pandas infers dtypes chunk by chunk: a column that is all
+          missing in a chunk keeps its dtype from earlier chunks, and each
+          chunk is checked against the filter and the statistics columns.
+
+          Parquet output needs pyarrow.
+
+usage: python batch.py data/*.csv --filter age '>=55' --filter gender M
+                       [--out-dir out] [--format csv|parquet] [--workers 4]
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  The median is found with stats_engine.ChunkedMedian, from two
+            more passes over the file, instead of keeping every matching
+            value. Each chunk, not only the first, is checked against the
+            filter criteria and the statistics columns.
+            Add conform_chunk(): a text column that is all missing in a
+            chunk is no longer read as numbers there.
+            Input files with the same name get distinct output files (see
+            output_stems()), instead of overwriting each other's.
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import data_engine as de
+import stats_engine as se
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+class ChunkWriter:
+    """
+    ChunkWriter : appends DataFrame chunks to a csv or Parquet file.
+
+    Attributes
+    ----------
+    path : str
+        output file
+    fmt : str
+        'csv' or 'parquet'
+
+    Methods
+    -------
+    write:
+        Appends a chunk of rows.
+    close:
+        Finishes the file.
+    """
+    def __init__(self, path,
+                       fmt='csv'
+                ):
+        """
+        Inits a ChunkWriter object.
+
+        Parameters
+        ----------
+        path : str
+            output file; replaced if it exists
+        fmt : str
+            'csv' or 'parquet'
+        """
+        if fmt == 'parquet' and pq is None:
+            raise RuntimeError('Parquet output needs pyarrow')
+
+        self.path = path
+        self.fmt = fmt
+        self.writer = None
+        self.rows = 0
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """Append a chunk of rows to the file."""
+        if self.fmt == 'parquet':
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = table.cast(self.writer.schema)
+            self.writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode='w' if self.rows == 0 else 'a',
+                         header=self.rows == 0, index=False)
+        self.rows += len(chunk)
+
+    def close(self, columns: list) -> None:
+        """Finish the file; with no rows written, write just the columns."""
+        if self.rows == 0:
+            self.write(pd.DataFrame(columns=columns))
+        if self.writer is not None:
+            self.writer.close()
+
+
+def conform_chunk(chunk: pd.DataFrame, dtypes: dict, numeric: set) -> pd.DataFrame:
+    """Give the columns of a chunk that are all missing the dtype of the
+    column in earlier chunks; add the dtypes of other columns to dtypes.
+
+    pandas infers dtypes chunk by chunk, so a text column that is all
+    missing in a chunk is read as float64. A column that has had no values
+    yet is text, unless it is in numeric: filtered by a number.
+    """
+    for c in chunk.columns:
+        col = chunk[c]
+        if not col.isna().all():
+            dtypes.setdefault(c, col.dtype)
+            continue
+
+        known = dtypes.get(c)
+        if known is None and c not in numeric:
+            known = np.dtype(object)
+        if known is not None and not pd.api.types.is_numeric_dtype(known):
+            chunk[c] = col.astype(known)
+
+    return chunk
+
+
+def read_matched(path: str,
+                 criteria: list,
+                 chunksize: int,
+                 columns: list | None = None):
+    """Yield (chunk, matching rows) for each chunk of a csv file.
+
+    With columns, only those columns and the filtered columns are read.
+    Columns that are all missing in a chunk keep the dtype of earlier
+    chunks (see conform_chunk()). Raises ValueError if the criteria do not
+    suit a chunk's dtypes, e.g. a column read as numbers in one chunk and
+    as text in a later one.
+    """
+    usecols = None
+    if columns is not None:
+        wanted = set(columns) | {c for c, _ in criteria}
+        usecols = lambda name: name.replace(' ', '_') in wanted
+
+    numeric = {c for c, criterion in criteria if criterion.strip()
+               and de.validate_criterion(criterion, c)['value']
+                     .replace('.', '', 1).isnumeric()}
+    dtypes = {}
+
+    rows_in = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=usecols):
+        chunk = conform_chunk(de.clean_column_names(chunk), dtypes, numeric)
+        spec = de.make_filter(chunk, criteria) if criteria else ()
+        if isinstance(spec, int):
+            raise ValueError(f'{de.FILTER_ERRORS[spec]} (rows from {rows_in})')
+
+        rows_in += len(chunk)
+        yield chunk, de.apply_filter(chunk, spec)
+
+
+def output_stems(paths: list) -> list:
+    """Return a distinct output file name stem for each input file.
+
+    The stem is the file name, without extension. Files with the same name
+    (e.g. a/data.csv and b/data.csv) get their directory name as a prefix
+    (a_data, b_data), and a number if that is not enough.
+    """
+    names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    counts = Counter(names)
+
+    stems = []
+    used = set()
+    for path, name in zip(paths, names):
+        stem = name
+        if counts[name] > 1:
+            parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+            stem = f'{parent}_{name}'
+        base = stem
+        n = 1
+        while stem in used:
+            n += 1
+            stem = f'{base}_{n}'
+        used.add(stem)
+        stems.append(stem)
+
+    return stems
+
+
+def process_file(path: str,
+                 criteria: list,
+                 out_dir: str,
+                 fmt: str = 'csv',
+                 chunksize: int = 100_000,
+                 stem: str | None = None) -> dict:
+    """Filter one csv file; write the matching rows and their statistics.
+
+    The output files are named from stem (default: the input file name;
+    see output_stems()). Returns a summary: rows read and written, and the
+    output file names.
+    """
+    if stem is None:
+        stem = os.path.splitext(os.path.basename(path))[0]
+    out_path = os.path.join(out_dir, f'{stem}.filtered.{fmt}')
+    stats_path = os.path.join(out_dir, f'{stem}.stats.csv')
+
+    writer = ChunkWriter(out_path, fmt)
+    running = None
+    stats_dict = {}
+    columns = []
+    rows_in = 0
+
+    for chunk, matched in read_matched(path, criteria, chunksize):
+        if running is None:
+            columns = list(chunk.columns)
+            stats_dict = de.stats_columns(chunk)
+            running = se.RunningStats(list(stats_dict))
+        else:
+            numeric = de.stats_columns(chunk)
+            for c in stats_dict:
+                if c not in numeric:
+                    raise ValueError(f'column {c} is not numeric in rows from {rows_in}')
+
+        rows_in += len(chunk)
+        writer.write(matched)
+
+        # moments merge across chunks
+        running.update(matched)
+
+    writer.close(columns)
+
+    if running is not None:
+        stats_agg = running.table(de.STAT_LIST)
+        if 'median' in de.STAT_LIST:
+            medians = {c: se.ChunkedMedian(running.moments[c]) for c in stats_dict}
+            for _, matched in read_matched(path, criteria, chunksize, list(medians)):
+                for c, med in medians.items():
+                    med.count(matched[c].to_numpy(dtype=np.float64, na_value=np.nan))
+            for _, matched in read_matched(path, criteria, chunksize, list(medians)):
+                for c, med in medians.items():
+                    med.keep(matched[c].to_numpy(dtype=np.float64, na_value=np.nan))
+            for c, med in medians.items():
+                stats_agg.loc['median', c] = med.value()
+        stats_agg.to_csv(stats_path)
+
+    return {'path': path,
+            'rows_in': rows_in,
+            'rows_out': writer.rows,
+            'output': out_path,
+            'stats': stats_path if running is not None else None}
+
+
+def main(argv: list | None = None) -> int:
+    """Run the batch filter; return the exit status."""
+    parser = argparse.ArgumentParser(
+        description='Filter csv files and compute statistics, without the UI.')
+    parser.add_argument('files', nargs='+', help='csv files to process')
+    parser.add_argument('--filter', nargs=2, action='append', default=[],
+                        metavar=('COLUMN', 'CRITERION'),
+                        help="e.g. --filter age '>=55' --filter gender M")
+    parser.add_argument('--out-dir', default='.',
+                        help='directory for output files')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help='format of the filtered data')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='number of worker processes')
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help='rows read at a time')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    criteria = [tuple(f) for f in args.filter]
+    failed = 0
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(process_file, path, criteria, args.out_dir,
+                               args.format, args.chunksize, stem): path
+                   for path, stem in zip(args.files, output_stems(args.files))}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                print(f'{futures[future]}: error: {e}', file=sys.stderr)
+                continue
+            print(f'{result["path"]}: {result["rows_out"]:,} of '
+                  f'{result["rows_in"]:,} rows -> {result["output"]}')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+program: bench_batch.py
+
+purpose: time batch.process_file() at several chunk sizes, and check its
+         output rows and statistics against pandas on the whole file.
+
+comments: The gender column is all missing in the second chunk (of the
+          smallest chunk size), which pandas reads as float64; the filter
+          on gender must still work, as for the whole file.
+
+usage: python benchmarks/bench_batch.py [--rows 1000000]
+                                        [--chunksize 50000 200000]
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch
+import data_engine as de
+from strain_synth import make_strain_data
+
+CRITERIA = [('age', '>=55'), ('gender', '!=M')]
+
+
+def expected(raw: pd.DataFrame) -> pd.DataFrame:
+    """Return the rows of the whole file that match CRITERIA."""
+    return raw[(raw['age'] >= 55) & (raw['gender'] != 'M')].reset_index(drop=True)
+
+
+def run(nrows: int, chunksizes: list) -> None:
+    data = make_strain_data(nrows)
+    first = min(chunksizes)
+    data.loc[first:2 * first - 1, 'gender'] = None
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = os.path.join(out_dir, f'strain_{nrows}.csv')
+        data.to_csv(path, index=False)
+        raw = de.clean_column_names(pd.read_csv(path))
+        matched = expected(raw)
+        ref = matched[list(de.stats_columns(raw))].agg(de.STAT_LIST)
+
+        print(f'\n{nrows:,} rows')
+        print(f'{"chunksize":>10} {"rows out":>10} {"time (ms)":>10}')
+        for chunksize in chunksizes:
+            t0 = time.perf_counter()
+            result = batch.process_file(path, CRITERIA, out_dir, 'csv', chunksize)
+            elapsed = time.perf_counter() - t0
+
+            out = pd.read_csv(result['output'])
+            pd.testing.assert_frame_equal(out, matched)
+            stats = pd.read_csv(result['stats'], index_col=0)
+            assert np.allclose(stats.to_numpy(), ref.to_numpy(), equal_nan=True)
+            print(f'{chunksize:>10,} {result["rows_out"]:>10,} {elapsed * 1e3:10.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark and check batch.process_file().')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--chunksize', type=int, nargs='+',
+                        default=[50_000, 200_000])
+    args = parser.parse_args()
+
+    for n in args.rows:
+        run(n, args.chunksize)
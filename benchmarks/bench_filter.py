@@ -0,0 +1,99 @@
+"""
+program: bench_filter.py
+
+purpose: compare the filter_engine mask path with the DataFrame.query()
+         path used previously by apply_filter(); check that the mask path
+         selects the same rows after data_loader.optimize_dtypes().
+
+usage: python benchmarks/bench_filter.py [--rows 1000000 10000000]
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  Some genders are missing; check the optimized (categorical)
+            frame against the raw one. Add a '!=' filter on gender.
+10-18-2026  Check that criteria typed with spaces ('>= 55') make the same
+            filter as without.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_engine as de
+import data_loader as dl
+import filter_engine as fe
+from strain_synth import make_strain_data
+
+SPECS = [fe.make_spec([('age', '>', '55')]),
+         fe.make_spec([('age', '>', '55'), ('gender', '==', 'M')]),
+         fe.make_spec([('age', '>=', '40'), ('TID', '<', '1.2'),
+                       ('stress_EF', '!=', '60')]),
+         fe.make_spec([('gender', '!=', 'M')])]
+
+# one row in this many has no gender
+MISSING_EVERY = 4
+
+# criteria as typed in the filter rows, with and without spaces; each
+# pair must make the same filter
+SPACED = [([('age', '>=55')], [('age', ' >= 55 ')]),
+          ([('gender', '!=M'), ('TID', '<1.2')],
+           [('TID', '< 1.2'), ('gender', '!= M')])]
+
+
+def check_spaced(data) -> None:
+    """Check that spaces in filter criteria don't change the filter."""
+    for plain, spaced in SPACED:
+        spec = de.make_filter(data, plain)
+        spaced_spec = de.make_filter(data, spaced)
+        assert isinstance(spaced_spec, tuple), de.FILTER_ERRORS[spaced_spec]
+        assert fe.canonical_spec(spaced_spec) == fe.canonical_spec(spec)
+
+
+def best_of(fn, repeat: int) -> float:
+    """Return the best wall time, in seconds, of repeated calls to fn."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    return min(times)
+
+
+def run(nrows: int, repeat: int) -> None:
+    data = make_strain_data(nrows)
+    data.loc[::MISSING_EVERY, 'gender'] = None
+    optimized, _, _ = dl.optimize_dtypes(data)
+    check_spaced(optimized)
+    print(f'\n{nrows:,} rows')
+    print(f'{"filter":<45} {"query (ms)":>12} {"mask (ms)":>12} {"speedup":>8}')
+
+    for spec in SPECS:
+        expr = fe.to_query(spec)
+
+        t_query = best_of(lambda: data.query(expr), repeat)
+        t_mask = best_of(lambda: fe.filter_frame(data, spec), repeat)
+
+        assert data.query(expr).index.equals(fe.filter_frame(data, spec).index)
+        assert fe.filter_frame(optimized, spec).index.equals(
+            fe.filter_frame(data, spec).index)
+        print(f'{expr:<45} {t_query * 1e3:12.1f} {t_mask * 1e3:12.1f} '
+              f'{t_query / t_mask:8.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark filter_engine against DataFrame.query().')
+    parser.add_argument('--rows', type=int, nargs='+',
+                        default=[1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for n in args.rows:
+        run(n, args.repeat)
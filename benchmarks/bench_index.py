@@ -0,0 +1,108 @@
+"""
+program: bench_index.py
+
+purpose: time column index lookups (column_index) against full column
+         scans (filter_engine.filter_mask), for range and equality terms
+         of different selectivity.
+
+comments: An index lookup is two binary searches, so its time grows with
+          log(rows); the scan grows with rows. Getting the matching rows
+          from the index also costs time in proportion to the number of
+          matches.
+
+usage: python benchmarks/bench_index.py [--rows 1000000 10000000]
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  Some genders are missing; add a '!=' filter on gender, and check
+            the indexed rows against a scan of the raw (object) column.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import column_index as ci
+import data_loader as dl
+import filter_engine as fe
+from strain_synth import make_strain_data
+
+SPECS = [fe.make_spec([('TID', '>', '1.4')]),
+         fe.make_spec([('TID', '>', '1.3')]),
+         fe.make_spec([('age', '==', '55')]),
+         fe.make_spec([('gender', '==', 'U')]),
+         fe.make_spec([('TID', '>', '1.3'), ('gender', '==', 'M')]),
+         fe.make_spec([('gender', '!=', 'M')])]
+
+# one row in this many has no gender
+MISSING_EVERY = 4
+
+
+def best_of(fn, repeat: int) -> float:
+    """Return the best wall time, in seconds, of repeated calls to fn."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    return min(times)
+
+
+def run(nrows: int, repeat: int) -> None:
+    raw = make_strain_data(nrows)
+    raw.loc[::MISSING_EVERY, 'gender'] = None
+    data, _, _ = dl.optimize_dtypes(raw)
+    indexes = ci.ColumnIndexes()
+
+    print(f'\n{nrows:,} rows')
+    for column in ['TID', 'age', 'gender']:
+        t0 = time.perf_counter()
+        indexes.get(data, column)
+        print(f'build index on {column}: {(time.perf_counter() - t0) * 1e3:.0f} ms')
+
+    print(f'{"filter":<30} {"matches":>10} {"scan (ms)":>10} '
+          f'{"lookup (us)":>12} {"rows (ms)":>10}')
+    for spec in SPECS:
+        term = spec[0]
+        index = indexes.get(data, term.column)
+        value = fe.typed_value(term.value, data[term.column].dtype)
+
+        if isinstance(index, ci.CategoryIndex):
+            lookup = lambda: index.slices(fe.OPS[term.op][0](index.categories, value),
+                                          missing=(term.op == '!='))
+        else:
+            lookup = lambda: index.slices(term.op, value)
+
+        scan = lambda: np.flatnonzero(fe.filter_mask(data, spec))
+        indexed = lambda: fe.indexed_rows(data, spec, indexes, max_fraction=1.0)
+
+        rows = indexed()
+        assert np.array_equal(rows, scan())
+        assert np.array_equal(rows, np.flatnonzero(fe.filter_mask(raw, spec)))
+
+        t_scan = best_of(scan, repeat)
+        t_lookup = best_of(lookup, repeat)
+        t_rows = best_of(indexed, repeat)
+        print(f'{fe.to_query(spec):<30} {len(rows):>10,} {t_scan * 1e3:10.1f} '
+              f'{t_lookup * 1e6:12.1f} {t_rows * 1e3:10.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark column index lookups against column scans.')
+    parser.add_argument('--rows', type=int, nargs='+',
+                        default=[1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for n in args.rows:
+        run(n, args.repeat)
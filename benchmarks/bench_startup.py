@@ -0,0 +1,120 @@
+"""
+program: bench_startup.py
+
+purpose: measure startup time: the import time of the application's
+         modules (python -X importtime), and optionally the time to build
+         the main window.
+
+comments: Each measurement runs in a new interpreter, so nothing is
+          already imported. The report lists the slowest imports, and
+          checks that matplotlib is not imported at startup.
+
+          --main imports main.py, which needs a display, the ui_RF and
+          styles modules, and the dataset; the window is built, updated
+          once and destroyed.
+
+usage: python benchmarks/bench_startup.py [--repeat 5] [--top 10] [--main]
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  Add the modules imported by main.py since: chunk_store,
+            instrument, table_text.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules imported by main.py at startup, other than the UI modules
+STARTUP_MODULES = ['rf_custom_ui', 'chunk_store', 'data_engine',
+                   'filter_engine', 'stats_engine', 'table_text', 'data_loader',
+                   'instrument', 'workers', 'plot_data']
+
+# imported by the time the main window is shown
+MAIN_CODE = 'import main; main.root.update(); main.quit_app()'
+
+
+def run_python(code: str, importtime: bool = False) -> tuple:
+    """Run code in a new interpreter, in the repo; return (seconds, stderr)."""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', code]
+
+    t0 = time.perf_counter()
+    done = subprocess.run(cmd, cwd=REPO, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    if done.returncode != 0:
+        raise RuntimeError(done.stderr.strip().splitlines()[-1])
+
+    return elapsed, done.stderr
+
+
+def slowest_imports(report: str, max_depth: int = 1) -> list:
+    """Return (cumulative us, module) for imports in an importtime report.
+
+    Depth 0 is a top-level import; depth 1 is imported by one of those,
+    e.g. pandas, imported by data_engine.
+    """
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        # nested imports are indented two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= max_depth:
+            imports.append((int(cumulative), name.strip()))
+
+    return sorted(imports, reverse=True)
+
+
+def best_of(code: str, repeat: int) -> float:
+    """Return the best wall time, in seconds, of running code."""
+    return min(run_python(code)[0] for _ in range(repeat))
+
+
+def run(repeat: int, top: int, with_main: bool) -> None:
+    baseline = best_of('pass', repeat)
+    modules_code = 'import ' + ', '.join(STARTUP_MODULES)
+    t_modules = best_of(modules_code, repeat)
+
+    print(f'interpreter start:        {baseline * 1e3:8.0f} ms')
+    print(f'startup modules imported: {t_modules * 1e3:8.0f} ms '
+          f'(+{(t_modules - baseline) * 1e3:.0f} ms)')
+
+    _, report = run_python(modules_code, importtime=True)
+    print('\nslowest imports:')
+    for cumulative, name in slowest_imports(report)[:top]:
+        print(f'   {cumulative / 1e3:8.1f} ms  {name}')
+
+    _, loaded = run_python(modules_code + '; import sys; '
+                           'print("matplotlib" in sys.modules, file=sys.stderr)')
+    if loaded.strip() == 'True':
+        print('\nWARNING: matplotlib is imported at startup')
+    else:
+        print('\nmatplotlib is not imported at startup')
+
+    if with_main:
+        t_main = best_of(MAIN_CODE, repeat)
+        print(f'\nmain window built:        {t_main * 1e3:8.0f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measure startup and import time.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10,
+                        help='number of slowest imports to list')
+    parser.add_argument('--main', action='store_true',
+                        help='also time building the main window')
+    args = parser.parse_args()
+
+    run(args.repeat, args.top, args.main)
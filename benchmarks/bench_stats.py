@@ -0,0 +1,69 @@
+"""
+program: bench_stats.py
+
+purpose: compare stats_engine.agg_stats() with DataFrame.agg(stats_dict),
+         as used previously for the statistics panel.
+
+usage: python benchmarks/bench_stats.py [--rows 2000000] [--cols 6 40]
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stats_engine as se
+
+stat_list = ['mean', 'std', 'min', 'median', 'max', 'skew', 'kurtosis']
+
+
+def make_wide_data(nrows: int, ncols: int, seed: int = 0) -> pd.DataFrame:
+    """Return a frame of ncols numeric columns, alternating int and float."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for i in range(ncols):
+        if i % 2:
+            columns[f'f{i}'] = rng.normal(60.0, 12.0, nrows)
+        else:
+            columns[f'i{i}'] = rng.integers(20, 90, nrows)
+
+    return pd.DataFrame(columns)
+
+
+def run(nrows: int, ncols: int) -> None:
+    data = make_wide_data(nrows, ncols)
+    stats_dict = {c: stat_list for c in data.columns}
+
+    t0 = time.perf_counter()
+    expected = data.agg(stats_dict)
+    t1 = time.perf_counter()
+    result = se.agg_stats(data, stats_dict)
+    t2 = time.perf_counter()
+
+    pd.testing.assert_frame_equal(expected.astype('float64'), result, rtol=1e-8)
+    print(f'{nrows:>12,} {ncols:>6} {(t1 - t0) * 1e3:12.1f} '
+          f'{(t2 - t1) * 1e3:12.1f} {(t1 - t0) / (t2 - t1):8.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark stats_engine against DataFrame.agg().')
+    parser.add_argument('--rows', type=int, nargs='+', default=[2_000_000])
+    parser.add_argument('--cols', type=int, nargs='+', default=[6, 40])
+    args = parser.parse_args()
+
+    print(f'{"rows":>12} {"cols":>6} {"agg (ms)":>12} {"engine (ms)":>12} {"speedup":>8}')
+    for n in args.rows:
+        for c in args.cols:
+            run(n, c)
@@ -0,0 +1,224 @@
+"""
+program: bench_suite.py
+
+purpose: time each hot path of the application, from reading the csv file
+         to preparing a plot, on synthetic strain datasets of several
+         sizes; write the times as JSON, and compare them with a baseline.
+
+comments: The stages are the work done by main.py, without tkinter:
+            load      pd.read_csv() and clean_column_names()
+            optimize  data_loader.optimize_dtypes(), when loading is done
+            filter    make_filter() and apply_filter()
+            stats     the statistics table of the filtered rows
+            groupby   the statistics table of each gender, for the
+                      filtered rows
+            measure   column widths of the dataset, for the data window
+            render    formatting for show_filtered(): the rows of the data
+                      window, and the statistics table
+            line, bar, scatter
+                      the data preparation of the three plot functions
+
+          The csv file for each size is written once, to the temp
+          directory, and reused. Each time is the best of --repeat runs.
+
+          With --baseline, a stage slower than the baseline by more than
+          --tolerance (and by more than 1 ms) is reported as a regression,
+          and the exit status is 1. A baseline is machine-specific: write
+          one with --save-baseline on the machine that runs the comparison.
+
+usage: python benchmarks/bench_suite.py [--rows 10000 1000000 10000000]
+                                        [--out results.json]
+                                        [--baseline benchmarks/baseline.json]
+                                        [--save-baseline]
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  render times table_text.TableFormatter, as used by the app; add
+            the measure stage.
+10-18-2026  Add the groupby stage.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_engine as de
+import data_loader as dl
+import plot_data as pdata
+import table_text as tt
+from strain_synth import make_strain_data
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baseline.json')
+
+CRITERIA = [('age', '>=55'), ('gender', 'M')]
+
+# as in main.py and custui.DataFrameText: 15 visible rows, 50 buffer rows
+# on each side; plot point budgets
+WINDOW_ROWS = 15 + 2 * 50
+LINE_POINT_BUDGET = 4000
+SCATTER_POINT_BUDGET = 20000
+
+# a regression must also be slower by this much, to ignore timer noise
+MIN_SLOWDOWN_S = 0.001
+
+
+def best_of(fn, repeat: int) -> tuple:
+    """Return the best wall time, in seconds, of repeated calls to fn,
+    and the result of the last call."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+
+    return min(times), result
+
+
+def csv_file(nrows: int) -> str:
+    """Return a synthetic csv file of nrows records; write it if needed.
+
+    Column names have spaces, as in the strain data files.
+    """
+    path = os.path.join(tempfile.gettempdir(), f'strain_synth_{nrows}.csv')
+    if not os.path.exists(path):
+        data = make_strain_data(nrows)
+        data.columns = data.columns.str.replace('_', ' ')
+        data.to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+
+    return path
+
+
+def run(nrows: int, repeat: int) -> dict:
+    """Time each stage on nrows records; return {stage: seconds}."""
+    path = csv_file(nrows)
+    times = {}
+
+    times['load'], data = best_of(
+        lambda: de.clean_column_names(pd.read_csv(path)), repeat)
+    times['optimize'], (data, _, _) = best_of(
+        lambda: dl.optimize_dtypes(data), repeat)
+
+    def filter_data():
+        spec = de.make_filter(data, CRITERIA)
+        return de.apply_filter(data, spec)
+
+    times['filter'], filtered = best_of(filter_data, repeat)
+
+    stats_dict = de.stats_columns(data)
+    times['stats'], stats_agg = best_of(
+        lambda: de.stats_table(filtered, stats_dict), repeat)
+    times['groupby'], _ = best_of(
+        lambda: de.stats_table(filtered, stats_dict, by='gender'), repeat)
+
+    times['measure'], formatter = best_of(lambda: tt.TableFormatter(data), repeat)
+
+    def render():
+        lines = formatter.view(filtered).lines(0, WINDOW_ROWS)
+        table = tt.TableFormatter(stats_agg, '{:0.2f}').text()
+        return lines, table
+
+    times['render'], _ = best_of(render, repeat)
+
+    buffers = {name: pdata.PlotBuffers() for name in ['line', 'scatter']}
+
+    def line():
+        xs, ys = pdata.sorted_xy(filtered, 'age', 'TID', buffers['line'])
+        return pdata.decimate_line(xs, ys, LINE_POINT_BUDGET)
+
+    def scatter():
+        xs, ys, codes, _ = pdata.scatter_xyc(filtered, 'age', 'TID', 'gender',
+                                             ['M', 'F', 'U'], buffers['scatter'])
+        return pdata.decimate_scatter(xs, ys, codes, SCATTER_POINT_BUDGET)
+
+    times['line'], _ = best_of(line, repeat)
+    times['bar'], _ = best_of(
+        lambda: pdata.aggregate_bar(filtered, 'age', 'TID', 'mean'), repeat)
+    times['scatter'], _ = best_of(scatter, repeat)
+
+    return times
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print each time against the baseline; return the regressions."""
+    regressions = []
+    print(f'\n{"rows":>12} {"stage":<10} {"baseline (ms)":>14} '
+          f'{"now (ms)":>10} {"ratio":>7}')
+    for rows, times in results['times'].items():
+        base_times = baseline['times'].get(rows, {})
+        for stage, t in times.items():
+            if stage not in base_times:
+                continue
+            base = base_times[stage]
+            ratio = t / base if base > 0 else float('inf')
+            flag = ''
+            if ratio > 1 + tolerance and t - base > MIN_SLOWDOWN_S:
+                flag = '  REGRESSION'
+                regressions.append((rows, stage, ratio))
+            print(f'{int(rows):>12,} {stage:<10} {base * 1e3:14.1f} '
+                  f'{t * 1e3:10.1f} {ratio:7.2f}{flag}')
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time the hot paths of the application; compare with '
+                    'a baseline.')
+    parser.add_argument('--rows', type=int, nargs='+',
+                        default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='baseline JSON file to compare with')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write the results to the baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown, as a fraction of the baseline')
+    args = parser.parse_args()
+
+    results = {'machine': {'python': platform.python_version(),
+                           'pandas': pd.__version__,
+                           'numpy': np.__version__,
+                           'platform': platform.platform(),
+                           'processor': platform.processor()},
+               'repeat': args.repeat,
+               'times': {}}
+
+    print(f'{"rows":>12} {"stage":<10} {"time (ms)":>10}')
+    for n in args.rows:
+        times = run(n, args.repeat)
+        results['times'][str(n)] = times
+        for stage, t in times.items():
+            print(f'{n:>12,} {stage:<10} {t * 1e3:10.1f}')
+
+    if args.out:
+        with open(args.out, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as fh:
+            json.dump(results, fh, indent=2)
+        print(f'\nbaseline written to {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s)')
+            sys.exit(1)
+    else:
+        print(f'\nno baseline at {args.baseline}; see --save-baseline')
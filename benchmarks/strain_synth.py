@@ -0,0 +1,36 @@
+"""
+module: strain_synth.py
+
+purpose: generate synthetic datasets with the columns of the strain data,
+         for benchmarks.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def make_strain_data(nrows: int, seed: int = 0) -> pd.DataFrame:
+    """Return a DataFrame like strain_nml_sample.csv, with nrows records.
+
+    Column names are already cleaned (spaces replaced with '_').
+    """
+    rng = np.random.default_rng(seed)
+
+    codes = np.array([f'Pt{i:05d}' for i in range(min(nrows, 50_000))],
+                     dtype=object)
+
+    return pd.DataFrame({
+        'pt_code': codes[rng.integers(0, len(codes), nrows)],
+        'gender': np.array(['M', 'F', 'U'], dtype=object)[
+                      rng.choice(3, nrows, p=[0.48, 0.48, 0.04])],
+        'age': rng.integers(20, 90, nrows),
+        'TID': np.round(rng.normal(1.1, 0.1, nrows), 2),
+        'stress_EF': rng.integers(40, 85, nrows),
+        'rest_EF': rng.integers(40, 85, nrows),
+    })
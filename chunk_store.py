@@ -0,0 +1,375 @@
+"""
+module: chunk_store.py
+
+purpose: out-of-core datasets, for data larger than memory: keep the
+         dataset on disk in chunks, filter it and compute its statistics
+         chunk by chunk, and read only the rows that are displayed or
+         plotted.
+
+comments: A store is a directory with one file per chunk of rows (Feather,
+          memory-mapped, if pyarrow is installed, otherwise pickle) and a
+          meta.json file. The directory name includes the source file's
+          mtime and size, so a changed source is stored again.
+
+          A filter result is an array of row positions. A StoreView (the
+          whole store, or the rows of a filter) acts enough like a
+          DataFrame for the data window (len, iloc[start:stop].to_string())
+          and for plot_data (view[column]).
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  read_chunk() casts each chunk to the common dtypes in meta.json.
+"""
+
+import json
+import math
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import data_loader as dl
+import filter_engine as fe
+import stats_engine as se
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+STORE_DIR = '.data_store'
+
+
+def store_path(path: str) -> str:
+    """Return the store directory for the current version of a source file."""
+    st = os.stat(path)
+    prefix = os.path.basename(dl.cache_prefix(path))
+
+    return os.path.join(STORE_DIR, f'{prefix}.{st.st_mtime_ns}.{st.st_size}')
+
+
+def common_dtype(dtypes: list) -> np.dtype:
+    """Return the dtype that holds a column's values from every chunk."""
+    if all(isinstance(d, np.dtype) and d.kind in 'iuf' for d in dtypes):
+        return np.result_type(*dtypes)
+
+    return np.dtype(object)
+
+
+def build_store(path: str,
+                chunksize: int = 1_000_000,
+                prepare=None) -> str:
+    """Read a csv file in chunks, and write each chunk to a new store.
+
+    Only one chunk is in memory at a time. Returns the store directory.
+    """
+    directory = store_path(path)
+    tmp = directory + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    ext = '.feather' if feather is not None else '.pkl'
+    lengths = []
+    dtypes = {}
+
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=chunksize)):
+        if prepare is not None:
+            chunk = prepare(chunk)
+        chunk = chunk.reset_index(drop=True)
+
+        chunk_file = os.path.join(tmp, f'chunk_{i:05d}{ext}')
+        if feather is not None:
+            feather.write_feather(chunk, chunk_file)
+        else:
+            chunk.to_pickle(chunk_file)
+
+        lengths.append(len(chunk))
+        for c in chunk.columns:
+            dtypes.setdefault(c, []).append(chunk[c].dtype)
+
+    meta = {'source': os.path.abspath(path),
+            'ext': ext,
+            'lengths': lengths,
+            'columns': list(dtypes),
+            'dtypes': {c: common_dtype(d).str for c, d in dtypes.items()}}
+    with open(os.path.join(tmp, 'meta.json'), 'w') as fh:
+        json.dump(meta, fh)
+
+    # replace older stores of the same file
+    prefix = os.path.basename(directory).rsplit('.', 2)[0] + '.'
+    if os.path.isdir(STORE_DIR):
+        for name in os.listdir(STORE_DIR):
+            if name.startswith(prefix) and not name.endswith('.tmp'):
+                shutil.rmtree(os.path.join(STORE_DIR, name), ignore_errors=True)
+    os.replace(tmp, directory)
+
+    return directory
+
+
+def open_store(path: str,
+               chunksize: int = 1_000_000,
+               prepare=None) -> 'ChunkStore':
+    """Return the store of a csv file; build it first if needed."""
+    directory = store_path(path)
+    if not os.path.exists(os.path.join(directory, 'meta.json')):
+        build_store(path, chunksize, prepare)
+
+    return ChunkStore(directory)
+
+
+class ChunkStore:
+    """
+    ChunkStore : a dataset kept on disk, as files of chunks of rows.
+
+    Attributes
+    ----------
+    directory : str
+        the store directory
+    columns : pd.Index
+        column names
+    dtypes : pd.Series
+        dtype of each column, common to all chunks
+    lengths : list
+        rows in each chunk
+    starts : np.ndarray
+        position of the first row of each chunk, and the total rows
+
+    Methods
+    -------
+    read_chunk:
+        Returns some columns of one chunk.
+    chunks:
+        Yields some columns of the chunks, for some rows.
+    filter_rows:
+        Returns positions of the rows that match a filter spec.
+    stats:
+        Returns a statistics table, like agg_stats().
+    take:
+        Returns the rows at some positions, as a DataFrame.
+    """
+    def __init__(self, directory):
+        """
+        Inits a ChunkStore object.
+
+        Parameters
+        ----------
+        directory : str
+            a store directory, written by build_store()
+        """
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as fh:
+            meta = json.load(fh)
+
+        self.ext = meta['ext']
+        self.lengths = meta['lengths']
+        self.columns = pd.Index(meta['columns'])
+        self.dtypes = pd.Series({c: np.dtype(d) for c, d in meta['dtypes'].items()},
+                                dtype=object)
+        self.starts = np.concatenate([[0], np.cumsum(self.lengths)]).astype(np.intp)
+        self.nrows = int(self.starts[-1])
+
+    def read_chunk(self, i: int, columns: list | None = None) -> pd.DataFrame:
+        """Return columns (all, if None) of chunk i, with the store's dtypes."""
+        chunk_file = os.path.join(self.directory, f'chunk_{i:05d}{self.ext}')
+        if self.ext == '.feather':
+            chunk = feather.read_table(chunk_file, columns=columns,
+                                       memory_map=True).to_pandas()
+        else:
+            chunk = pd.read_pickle(chunk_file)
+            if columns is not None:
+                chunk = chunk[columns]
+
+        # a chunk keeps the dtypes read from its own rows, e.g. float64 for
+        # a text column that is all missing in that chunk
+        cast = {c: self.dtypes[c] for c in chunk.columns
+                if chunk[c].dtype != self.dtypes[c]}
+
+        return chunk.astype(cast) if cast else chunk
+
+    def chunks(self, columns: list | None = None, rows: np.ndarray | None = None):
+        """Yield (chunk number, DataFrame) for each chunk, in order.
+
+        With rows (sorted positions in the store), only those rows of each
+        chunk are yielded, and chunks without any are skipped.
+        """
+        for i in range(len(self.lengths)):
+            start, stop = self.starts[i], self.starts[i + 1]
+            if rows is None:
+                yield i, self.read_chunk(i, columns)
+                continue
+
+            lo, hi = np.searchsorted(rows, [start, stop])
+            if lo < hi:
+                yield i, self.read_chunk(i, columns).iloc[rows[lo:hi] - start]
+
+    def filter_rows(self, spec: tuple, rows: np.ndarray | None = None) -> np.ndarray:
+        """Return positions of the rows (of all, or of rows) that match a spec.
+
+        Only the columns named in the spec are read.
+        """
+        columns = list(dict.fromkeys(t.column for t in spec))
+        matched = []
+        for i, chunk in self.chunks(columns, rows):
+            local = np.flatnonzero(fe.filter_mask(chunk, spec))
+            if rows is None:
+                matched.append(local + self.starts[i])
+            else:
+                lo, hi = np.searchsorted(rows, self.starts[i:i + 2])
+                matched.append(rows[lo:hi][local])
+
+        return np.concatenate(matched + [np.empty(0, dtype=np.intp)])
+
+    def stats(self, stats_dict: dict, rows: np.ndarray | None = None) -> pd.DataFrame:
+        """Return a statistics table for all rows, or for rows.
+
+        Moment statistics are merged over chunks, in one pass; the median
+        takes two more passes (see stats_engine.ChunkedMedian). Only the
+        columns in stats_dict are read.
+        """
+        columns = list(stats_dict)
+        stat_rows = list(dict.fromkeys(st for sl in stats_dict.values() for st in sl))
+
+        def column_arrays():
+            for _, chunk in self.chunks(columns, rows):
+                yield {c: chunk[c].to_numpy(dtype=np.float64, na_value=np.nan)
+                       for c in columns}
+
+        moments = {c: se.Moments() for c in columns}
+        for arrays in column_arrays():
+            for c in columns:
+                moments[c] = moments[c].merge(se.Moments.from_array(arrays[c]))
+
+        medians = {c: se.ChunkedMedian(moments[c]) for c in columns
+                   if 'median' in stats_dict[c]}
+        if medians:
+            for arrays in column_arrays():
+                for c, med in medians.items():
+                    med.count(arrays[c])
+            for arrays in column_arrays():
+                for c, med in medians.items():
+                    med.keep(arrays[c])
+
+        table = {}
+        for c in columns:
+            col_values = []
+            for st in stat_rows:
+                if st not in stats_dict[c]:
+                    col_values.append(math.nan)
+                elif st == 'median':
+                    col_values.append(medians[c].value())
+                elif st in se.MOMENT_STATS:
+                    col_values.append(moments[c].value(st))
+                else:
+                    col_values.append(math.nan)
+            table[c] = col_values
+
+        return pd.DataFrame(table, index=stat_rows, dtype=np.float64)
+
+    def take(self, rows: np.ndarray | None, columns: list | None = None) -> pd.DataFrame:
+        """Return the rows at sorted positions rows (all, if None) as a DataFrame.
+
+        The index is the row positions in the store.
+        """
+        parts = [chunk for _, chunk in self.chunks(columns, rows)]
+        if not parts:
+            columns = list(self.columns) if columns is None else columns
+            return pd.DataFrame({c: pd.Series(dtype=self.dtypes[c]) for c in columns})
+
+        data = dl.combine_frames(parts)
+        data.index = np.arange(self.nrows) if rows is None else rows
+
+        return data
+
+
+class RowSlicer:
+    """
+    RowSlicer : the iloc of a StoreView; selects rows, without reading them.
+
+    Methods
+    -------
+    __getitem__:
+        Returns a StoreView of the rows at positions, or in a slice.
+    """
+    def __init__(self, view):
+        """Inits a RowSlicer for a StoreView."""
+        self.view = view
+
+    def __getitem__(self, key) -> 'StoreView':
+        """Return a StoreView of view rows selected by a slice or positions."""
+        view = self.view
+        if isinstance(key, slice):
+            if view.rows is None:
+                rows = np.arange(*key.indices(len(view)))
+            else:
+                rows = view.rows[key]
+        else:
+            positions = np.asarray(key, dtype=np.intp)
+            rows = positions if view.rows is None else view.rows[positions]
+
+        return StoreView(view.store, rows)
+
+
+class StoreView:
+    """
+    StoreView : rows of a ChunkStore, used in place of a DataFrame.
+
+    Rows are read from disk only when needed: to_string() reads all
+    columns of the view's rows; view[column] reads one column.
+
+    Attributes
+    ----------
+    store : ChunkStore
+    rows : np.ndarray
+        sorted positions of the rows in the store; None for all rows
+    columns : pd.Index
+    dtypes : pd.Series
+    iloc : RowSlicer
+        selects rows by position, like DataFrame.iloc
+
+    Methods
+    -------
+    to_frame:
+        Returns the rows as a DataFrame.
+    to_string:
+        Returns the rows formatted, like DataFrame.to_string().
+    """
+    def __init__(self, store,
+                       rows=None
+                ):
+        """
+        Inits a StoreView object.
+
+        Parameters
+        ----------
+        store : ChunkStore
+        rows : np.ndarray
+            sorted row positions in the store; None for all rows
+        """
+        self.store = store
+        self.rows = rows
+        self.columns = store.columns
+        self.dtypes = store.dtypes
+        self.iloc = RowSlicer(self)
+
+    def __len__(self) -> int:
+        return self.store.nrows if self.rows is None else len(self.rows)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def __getitem__(self, column: str) -> pd.Series:
+        """Return one column of the view's rows, read from the store."""
+        return self.store.take(self.rows, [column])[column]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return all columns of the view's rows, read from the store."""
+        return self.store.take(self.rows)
+
+    def to_string(self) -> str:
+        """Return the view's rows formatted, like DataFrame.to_string()."""
+        return self.to_frame().to_string()
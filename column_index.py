@@ -0,0 +1,246 @@
+"""
+module: column_index.py
+
+purpose: per-column indexes, to find the rows that match a range or
+         equality criterion without scanning the whole column.
+
+comments: A SortedIndex (numeric columns) keeps the row order that sorts
+          the column; a range of values is a range of that order, found
+          with searchsorted. A CategoryIndex (categorical columns) keeps
+          the rows of each category together, as an inverted index.
+
+          Lookups return (start, stop) slices of the index order; rows()
+          turns them into row positions, in row order.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  CategoryIndex.slices() includes missing values for '!=', as
+            SortedIndex does.
+            SortedIndex.bound() searches float32 values with a float64 key.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnIndex:
+    """
+    ColumnIndex : base class; a row order that groups equal values.
+
+    Attributes
+    ----------
+    order : np.ndarray
+        row positions, in index order
+
+    Methods
+    -------
+    count:
+        Returns the number of rows in slices of order.
+    rows:
+        Returns row positions for slices of order.
+    """
+    def count(self, slices: list) -> int:
+        """Return the number of rows in slices of order."""
+        return sum(stop - start for start, stop in slices)
+
+    def rows(self, slices: list) -> np.ndarray:
+        """Return the row positions in slices of order, in row order."""
+        return np.sort(np.concatenate([self.order[start:stop]
+                                       for start, stop in slices]
+                                      + [np.empty(0, dtype=np.intp)]))
+
+
+class SortedIndex(ColumnIndex):
+    """
+    SortedIndex : row order that sorts a numeric column.
+
+    Extends: ColumnIndex
+
+    Missing values (NaN) sort last, and are never within a range.
+
+    Attributes
+    ----------
+    order : np.ndarray
+        row positions, in order of value
+    values : np.ndarray
+        the column values, sorted
+    n_valid : int
+        number of values that are not NaN
+
+    Methods
+    -------
+    slices:
+        Returns slices of order that match a criterion.
+    count:
+        Returns the number of rows that match a criterion.
+    rows:
+        Returns row positions for slices of order.
+    """
+    def __init__(self, values):
+        """
+        Inits a SortedIndex object.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            a numeric (int, uint or float) column
+        """
+        # rows() sorts the positions it returns, so the sort need not be stable
+        self.order = np.argsort(values)
+        self.values = values[self.order]
+        if values.dtype.kind == 'f':
+            self.n_valid = len(values) - int(np.count_nonzero(np.isnan(values)))
+        else:
+            self.n_valid = len(values)
+
+    def bound(self, key, side: str) -> int:
+        """Return the position of key in the sorted values, like searchsorted."""
+        dtype = self.values.dtype
+        if dtype.kind in 'iu':
+            info = np.iinfo(dtype)
+            if key < info.min:
+                return 0
+            if key > info.max:
+                return self.n_valid
+
+        # a float32 column is searched at float64 precision, as it is filtered
+        key = np.float64(key) if dtype.kind == 'f' else dtype.type(key)
+
+        return int(np.searchsorted(self.values[:self.n_valid], key, side=side))
+
+    def slices(self, op: str, value: int | float) -> list:
+        """Return (start, stop) slices of order for rows where: column op value."""
+        n = self.n_valid
+        if self.values.dtype.kind in 'iu':
+            # e.g. for int data, x > 5.5 is x > 5, and x >= 5.5 is x >= 6
+            floor, ceil = math.floor(value), math.ceil(value)
+        else:
+            floor = ceil = value
+
+        match op:
+            case '>':
+                return [(self.bound(floor, 'right'), n)]
+            case '>=':
+                return [(self.bound(ceil, 'left'), n)]
+            case '<':
+                return [(0, self.bound(ceil, 'left'))]
+            case '<=':
+                return [(0, self.bound(floor, 'right'))]
+            case '==':
+                if floor != ceil:
+                    return []
+                return [(self.bound(floor, 'left'), self.bound(floor, 'right'))]
+            case '!=':
+                # NaN != value, so missing values are included
+                equal = self.slices('==', value)
+                if not equal:
+                    return [(0, len(self.values))]
+                start, stop = equal[0]
+                return [(0, start), (stop, len(self.values))]
+            case _:
+                raise ValueError(f'unknown operator: {op}')
+
+
+class CategoryIndex(ColumnIndex):
+    """
+    CategoryIndex : rows of a categorical column, grouped by category.
+
+    Extends: ColumnIndex
+
+    The rows of category i are order[starts[i]:starts[i + 1]], in row
+    order. Missing values (code -1) come first, and match no category;
+    they are included for '!=' (see slices()).
+
+    Attributes
+    ----------
+    order : np.ndarray
+        row positions, in order of category code
+    categories : np.ndarray
+        the column's categories
+    starts : np.ndarray
+        start of each category in order, and the end of the last
+
+    Methods
+    -------
+    slices:
+        Returns slices of order for the categories that match.
+    count:
+        Returns the number of rows that match.
+    rows:
+        Returns row positions for slices of order.
+    """
+    def __init__(self, col):
+        """
+        Inits a CategoryIndex object.
+
+        Parameters
+        ----------
+        col : pd.Series
+            a column of dtype category
+        """
+        codes = col.cat.codes.to_numpy()
+        self.order = np.argsort(codes, kind='stable')
+        self.categories = col.cat.categories.to_numpy()
+        self.starts = np.searchsorted(codes[self.order],
+                                      np.arange(len(self.categories) + 1))
+
+    def slices(self, matched: np.ndarray, missing: bool = False) -> list:
+        """Return slices of order for the categories where matched is True,
+        and for the missing values if missing (NaN != value)."""
+        slices = [(self.starts[i], self.starts[i + 1])
+                  for i in np.flatnonzero(matched)]
+        if missing and self.starts[0] > 0:
+            slices.insert(0, (0, self.starts[0]))
+
+        return slices
+
+
+def build_index(col: pd.Series) -> ColumnIndex | None:
+    """Return an index for a column, or None if the column can't be indexed."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return CategoryIndex(col)
+    if isinstance(col.dtype, np.dtype) and col.dtype.kind in 'iuf':
+        return SortedIndex(col.to_numpy())
+
+    return None
+
+
+class ColumnIndexes:
+    """
+    ColumnIndexes : indexes for the columns of one dataset, built on use.
+
+    The indexes belong to one DataFrame; a different DataFrame (e.g. a
+    reloaded dataset) replaces them all.
+
+    Attributes
+    ----------
+    data : pd.DataFrame
+        the indexed dataset
+    indexes : dict
+        column name: index, or None for a column that can't be indexed
+
+    Methods
+    -------
+    get:
+        Returns the index of a column, building it if needed.
+    """
+    def __init__(self):
+        """Inits a ColumnIndexes object, with no indexes."""
+        self.data = None
+        self.indexes = {}
+
+    def get(self, data: pd.DataFrame, column: str) -> ColumnIndex | None:
+        """Return the index for a column of data, building it on first use."""
+        if data is not self.data:
+            self.data = data
+            self.indexes = {}
+
+        if column not in self.indexes:
+            self.indexes[column] = build_index(data[column])
+
+        return self.indexes[column]
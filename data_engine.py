@@ -0,0 +1,248 @@
+"""
+module: data_engine.py
+
+purpose: data operations of the application -- cleaning column names,
+         building and applying a data filter, choosing the statistics --
+         without tkinter, for use by main.py and by batch.py.
+
+comments: Filter criteria are (column, criterion) pairs, where criterion
+          is as typed in a filter row of the UI, e.g. ('age', '>=55') or
+          ('gender', 'M'). Messages for the user are passed to a report
+          function, if given, instead of to the status bar.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation. Moved from main.py: clean_column_names(),
+            validate_criterion(), make_filter(), and the filtering done by
+            apply_filter().
+10-18-2026  Functions that take data also take a chunk_store.StoreView, for
+            out-of-core datasets. Add stats_table() and count_rows().
+            make_filter() and stats_columns() read dtypes, not columns.
+10-18-2026  Record make_filter(), filter_rows() and stats_table() as the
+            'filter compile', 'filter eval' and 'stats' stages (see
+            instrument), instead of do_debug print statements.
+10-18-2026  stats_table() takes a group column, for a table per group (see
+            stats_engine.grouped_agg_stats()). Add group_columns().
+10-18-2026  validate_criterion() strips spaces from the criterion and the
+            value, so '>= 55' is a valid filter, the same as '>=55'.
+"""
+
+import numpy as np
+import pandas as pd
+
+import chunk_store as cs
+import filter_engine as fe
+import instrument as ins
+import stats_engine as se
+
+# for a good summary of skew and kurtosis, see medium.com
+STAT_LIST = ['mean', 'std', 'min', 'median', 'max', 'skew', 'kurtosis']
+
+# most groups offered for statistics by group; e.g. site codes, not patient ids
+MAX_GROUPS = 1000
+
+# make_filter() error codes
+FILTER_ERRORS = {-1: 'Invalid filter operator; use: =, ==, >, <, >=, <=',
+                 -2: 'No filter defined.',
+                 -3: "Can\'t compare text to numeric data.",
+                 -4: "Can\'t compare number to text data."}
+
+
+def clean_column_names(df: pd.core.frame.DataFrame) -> pd.core.frame.DataFrame:
+    """Convert single spaces in column names to underscore character."""
+
+    cols0 = df.columns
+    cols1 = cols0.map(lambda x: x.replace(' ', '_') if isinstance(x, str) else x)
+    df.columns = cols1
+
+    return df
+
+
+def validate_criterion(input: str, data_column: str) -> dict:
+    """Validate user-entered criterion for filtering data.
+
+    Returns a dict of op, value, and msg: a note for the user, or ''.
+    Spaces around the criterion and around the value are ignored, so
+    '>= 55' is the same criterion as '>=55'.
+    """
+    input = input.strip()
+    char1 = input[0]
+    if len(input) > 1:
+        char2 = input[1]
+    else:
+        char2 = ''
+    op = ''
+    value = ''
+    msg = ''
+
+    criterion = {'op': op,
+                 'value': value,
+                 'msg': msg}
+
+    if char1 in ['!', '=', '>', '<']:
+        if char2 == '=':
+                value = input[2:]
+                op = input[0:2]
+        else:
+            value = input[1:]
+            match char1:
+                case '!':
+                    op = '!='
+                case '=':
+                    op = '=='
+                case _  :
+                    op = char1
+    else:
+        op = '=='
+        msg = f'setting filter to match "{input}"'
+        value = input
+
+    criterion['op'] = op
+    criterion['value'] = value.strip()
+    criterion['msg'] = msg
+
+    return criterion
+
+
+@ins.traced('filter compile')
+def make_filter(data: pd.core.frame.DataFrame,
+                criteria: list,
+                report=None) -> int | tuple:
+    """Construct a data filter for a pandas DataFrame.
+
+    criteria is a list of (column, criterion) pairs; pairs with an empty
+    column or criterion are skipped. report, if given, is called with a
+    message for the user about each criterion.
+
+    Returns a filter spec: a tuple of (column, op, value) filter_engine.Term
+    objects, or a negative int for an invalid filter (see FILTER_ERRORS).
+    """
+    terms = []
+    err = 0      # False == no error
+
+    for this_filter, this_criterion in criteria:
+        if this_filter == '' or this_criterion.strip() == '':
+            continue
+
+        validated_entry = validate_criterion(this_criterion, this_filter)
+        if report is not None:
+            report(validated_entry['msg'])
+
+        the_op = validated_entry['op']
+        the_value = validated_entry['value']
+        data_type = data.dtypes[this_filter]
+
+        if the_value != '':
+
+            # test for numeric value.
+            # ...int or float will pass
+            if the_value.replace('.', '', 1).isnumeric():
+                if not pd.api.types.is_numeric_dtype(data_type):
+                    err = -4
+            else:
+                # value to check is not numeric, see if data is numeric
+                if pd.api.types.is_numeric_dtype(data_type):
+                    err = -3
+
+            terms.append(fe.Term(this_filter, the_op, the_value))
+        else:
+            # Not a valid filter criterion
+            err = -1
+
+    if not terms and not err:
+        # No filter defined
+        err = -2
+
+    if err:
+        return err
+
+    return fe.make_spec(terms)
+
+
+@ins.traced('filter eval')
+def filter_rows(data: pd.core.frame.DataFrame,
+                spec: tuple,
+                last_filter: fe.IncrementalFilter | None = None) -> np.ndarray:
+    """Return positions of the rows that match a filter spec.
+
+    With last_filter, a spec that adds terms to the previous one refines
+    its result, and selective terms use column indexes. For a StoreView,
+    the store is filtered chunk by chunk; positions are within the view.
+    """
+    if isinstance(data, cs.StoreView):
+        rows = data.store.filter_rows(spec, data.rows)
+        if data.rows is None:
+            return rows
+        return np.searchsorted(data.rows, rows)
+
+    if last_filter is not None:
+        return last_filter.apply(data, spec)
+
+    return np.flatnonzero(fe.filter_mask(data, spec))
+
+
+def apply_filter(data: pd.core.frame.DataFrame,
+                 spec: tuple,
+                 last_filter: fe.IncrementalFilter | None = None
+                 ) -> pd.core.frame.DataFrame:
+    """Return the rows of a DataFrame that match a filter spec."""
+    return data.iloc[filter_rows(data, spec, last_filter)]
+
+
+def stats_columns(data: pd.core.frame.DataFrame,
+                  stat_list: list = STAT_LIST) -> dict:
+    """Return {column: stat_list} for the numeric (not bool) columns."""
+    stats_dict = {}
+    for c, dtype in data.dtypes.items():
+        if (pd.api.types.is_numeric_dtype(dtype) and
+                not pd.api.types.is_bool_dtype(dtype)):
+            stats_dict[c] = stat_list
+
+    return stats_dict
+
+
+def group_columns(data: pd.core.frame.DataFrame,
+                  max_groups: int = MAX_GROUPS) -> list:
+    """Return the columns that can group rows for statistics: bool columns,
+    and category columns with at most max_groups categories.
+
+    Text columns with few distinct values are category columns once the
+    dataset is loaded (see data_loader.optimize_dtypes()).
+    """
+    return [c for c, dtype in data.dtypes.items()
+            if pd.api.types.is_bool_dtype(dtype)
+            or (isinstance(dtype, pd.CategoricalDtype)
+                and len(dtype.categories) <= max_groups)]
+
+
+@ins.traced('stats')
+def stats_table(data: pd.core.frame.DataFrame,
+                stats_dict: dict,
+                by: str | None = None) -> pd.core.frame.DataFrame:
+    """Return the statistics table for data; a StoreView is read in chunks.
+
+    With by, a group column, the table has the statistics of each group,
+    indexed by (group, statistic). Grouping a StoreView is not supported.
+    """
+    if isinstance(data, cs.StoreView):
+        if by is not None:
+            raise ValueError('statistics by group need an in-memory dataset')
+        return data.store.stats(stats_dict, data.rows)
+
+    if by is not None:
+        return se.grouped_agg_stats(data, stats_dict, by)
+
+    return se.agg_stats(data, stats_dict)
+
+
+def count_rows(data: pd.core.frame.DataFrame) -> int:
+    """Return the number of records: rows with a value in the first column.
+
+    For a StoreView, the number of rows.
+    """
+    if isinstance(data, cs.StoreView):
+        return len(data)
+
+    return int(data.iloc[:, 0].count())
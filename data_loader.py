@@ -0,0 +1,549 @@
+"""
+module: data_loader.py
+
+purpose: read a csv dataset in chunks, in a background thread, so the
+         UI can display the first rows while the rest are loading.
+
+comments: The pyarrow csv engine does not support chunksize, so the
+          default (C) engine is used.
+
+          Loaded datasets are cached in CACHE_DIR, as Feather files if
+          pyarrow is installed (memory-mapped when read), otherwise as
+          pickle files. The cache file name includes the source file's
+          mtime and size, so a changed source is never read from the cache.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  Add an on-disk cache of loaded datasets. See read_cached() and
+            write_cache().
+10-18-2026  Add optimize_dtypes(): downcast numeric columns and convert
+            low-cardinality text columns to category.
+10-18-2026  Add MultiFileLoader, to load a glob of csv files in parallel,
+            and combine_frames(), to concatenate frames with different
+            columns into one pre-allocated frame. Add open_dataset().
+10-18-2026  Record reading a dataset or file as the 'load' stage (see
+            instrument). Files read in worker processes are not recorded.
+"""
+
+import glob
+import hashlib
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import instrument as ins
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+CACHE_DIR = '.data_cache'
+
+
+def cache_prefix(path: str) -> str:
+    """Return the start of the cache file names for a source file."""
+    abs_path = os.path.abspath(path)
+    digest = hashlib.sha1(abs_path.encode()).hexdigest()[:16]
+
+    return os.path.join(CACHE_DIR, os.path.basename(path) + '.' + digest)
+
+
+def cache_path(path: str) -> str:
+    """Return the cache file name for the current version of a source file."""
+    st = os.stat(path)
+    ext = '.feather' if feather is not None else '.pkl'
+
+    return f'{cache_prefix(path)}.{st.st_mtime_ns}.{st.st_size}{ext}'
+
+
+def read_cached(path: str) -> pd.DataFrame | None:
+    """Return the cached dataset for a source file, or None if not cached."""
+    cached = cache_path(path)
+    if not os.path.exists(cached):
+        return None
+
+    try:
+        if cached.endswith('.feather'):
+            return feather.read_table(cached, memory_map=True).to_pandas()
+        return pd.read_pickle(cached)
+    except Exception:
+        # unreadable (e.g. written by another version); reload the source
+        return None
+
+
+def write_cache(path: str, data: pd.DataFrame) -> str:
+    """Write a loaded dataset to the cache, replacing older versions.
+
+    The file is written under a temporary name, then renamed, so an
+    interrupted write never leaves a partial cache file.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cached = cache_path(path)
+    tmp = cached + '.tmp'
+
+    data = data.reset_index(drop=True)
+    if feather is not None:
+        feather.write_feather(data, tmp)
+    else:
+        data.to_pickle(tmp)
+    os.replace(tmp, cached)
+
+    prefix = os.path.basename(cache_prefix(path)) + '.'
+    for name in os.listdir(CACHE_DIR):
+        old = os.path.join(CACHE_DIR, name)
+        if name.startswith(prefix) and old != cached:
+            os.remove(old)
+
+    return cached
+
+
+def optimize_dtypes(data: pd.DataFrame,
+                    max_category_ratio: float = 0.5) -> tuple:
+    """Return the data with smaller dtypes, and its memory before and after.
+
+    Integer columns are downcast to the smallest type that holds their
+    values. Float columns become float32 only if no value changes. Text
+    columns with few distinct values (at most max_category_ratio * rows)
+    become category.
+    """
+    before = data.memory_usage(deep=True).sum()
+    columns = {}
+
+    for c in data.columns:
+        col = data[c]
+        dtype = col.dtype
+
+        if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+            col = pd.to_numeric(col, downcast=('integer' if dtype.kind == 'i'
+                                               else 'unsigned'))
+        elif isinstance(dtype, np.dtype) and dtype.kind == 'f':
+            small = col.astype(np.float32)
+            if np.array_equal(small.to_numpy(dtype=np.float64), col.to_numpy(),
+                              equal_nan=True):
+                col = small
+        elif dtype == 'object':
+            if (pd.api.types.infer_dtype(col, skipna=True) == 'string'
+                    and col.nunique() <= max_category_ratio * len(col)):
+                col = col.astype('category')
+
+        columns[c] = col
+
+    optimized = pd.DataFrame(columns, index=data.index)
+    after = optimized.memory_usage(deep=True).sum()
+
+    return optimized, before, after
+
+
+class ChunkedLoader:
+    """
+    ChunkedLoader : reads a csv file in chunks, in a background thread.
+
+    Chunks are passed to the UI thread through a queue; call poll() from
+    the UI thread (e.g. with root.after) to collect them. If the file is
+    in the cache, the whole dataset is returned as the first chunk.
+
+    Attributes
+    ----------
+    path : str
+        csv file to read
+    chunksize : int
+        rows per chunk
+    prepare : function
+        applied to each chunk as it is read, e.g. to clean column names
+    use_cache : bool
+        read from, and allow saving to, the dataset cache
+    from_cache : bool
+        True if the dataset was read from the cache
+    rows_read : int
+        rows collected by poll() so far
+    done : bool
+        True when the whole file has been collected
+    error : Exception
+        set if reading failed
+
+    Methods
+    -------
+    start:
+        Starts the reader thread.
+    first_chunk:
+        Waits for, and returns, the first chunk.
+    poll:
+        Returns the chunks read since the last call, without waiting.
+    progress:
+        Returns the fraction of the file read.
+    save_cache:
+        Writes the assembled dataset to the cache, in the background.
+    """
+    def __init__(self, path,
+                       chunksize=100_000,
+                       prepare=None,
+                       use_cache=True
+                ):
+        """
+        Inits a ChunkedLoader object.
+
+        Parameters
+        ----------
+        path : str
+            csv file to read
+        chunksize : int
+            rows per chunk
+        prepare : function
+            takes and returns a DataFrame; applied to each chunk
+        use_cache : bool
+            read from, and allow saving to, the dataset cache
+        """
+        self.path = path
+        self.chunksize = chunksize
+        self.prepare = prepare
+        self.use_cache = use_cache
+        self.from_cache = False
+
+        self.rows_read = 0
+        self.done = False
+        self.error = None
+
+        self.file_size = os.path.getsize(path)
+        self.bytes_read = 0
+        self.chunks = queue.Queue()
+        self.thread = threading.Thread(target=self.read, daemon=True)
+
+    def start(self) -> None:
+        """Start reading the file in the background."""
+        self.thread.start()
+
+    def read(self) -> None:
+        """Reader thread: put each chunk on the queue, then None at the end."""
+        try:
+            with ins.stage('load') as st:
+                cached = read_cached(self.path) if self.use_cache else None
+                if cached is not None:
+                    self.from_cache = True
+                    self.bytes_read = self.file_size
+                    self.chunks.put(cached)
+                    st.rows_out = len(cached)
+                    return
+
+                rows = 0
+                with open(self.path, 'rb') as fh:
+                    for chunk in pd.read_csv(fh, chunksize=self.chunksize):
+                        if self.prepare is not None:
+                            chunk = self.prepare(chunk)
+                        self.bytes_read = fh.tell()
+                        self.chunks.put(chunk)
+                        rows += len(chunk)
+                st.rows_out = rows
+        except Exception as e:
+            self.error = e
+        finally:
+            self.chunks.put(None)
+
+    def first_chunk(self) -> pd.DataFrame:
+        """Wait for the first chunk and return it."""
+        chunk = self.chunks.get()
+        if chunk is None:
+            self.done = True
+            if self.error is not None:
+                raise self.error
+            chunk = pd.read_csv(self.path, nrows=0)
+            return chunk if self.prepare is None else self.prepare(chunk)
+
+        self.rows_read += len(chunk)
+
+        return chunk
+
+    def poll(self) -> list:
+        """Return the chunks read since the last call; does not wait."""
+        new_chunks = []
+        while not self.done:
+            try:
+                chunk = self.chunks.get_nowait()
+            except queue.Empty:
+                break
+
+            if chunk is None:
+                self.done = True
+            else:
+                self.rows_read += len(chunk)
+                new_chunks.append(chunk)
+
+        return new_chunks
+
+    def progress(self) -> float:
+        """Return the fraction of the file read, 0.0 to 1.0."""
+        if self.done or self.file_size == 0:
+            return 1.0
+
+        return min(1.0, self.bytes_read / self.file_size)
+
+    def save_cache(self, data: pd.DataFrame) -> None:
+        """Write the complete dataset to the cache, in a background thread."""
+        if not self.use_cache or self.from_cache or self.error is not None:
+            return
+
+        threading.Thread(target=write_cache,
+                         args=(self.path, data),
+                         daemon=True).start()
+
+    def combine(self, frames: list) -> pd.DataFrame:
+        """Return chunks (with the same columns) concatenated into one frame."""
+        return pd.concat(frames, ignore_index=True)
+
+
+def combined_column(parts: list, lengths: list) -> np.ndarray | pd.Categorical:
+    """Return one column from the parts of several frames, in one allocation.
+
+    parts holds a Series for each frame, or None where the frame lacks the
+    column; those rows are missing values. Categorical parts are combined
+    by their codes, over the union of their categories. Numeric parts take
+    the common dtype (float, if any rows are missing). Others are object.
+    """
+    total = sum(lengths)
+    present = [p for p in parts if p is not None]
+    missing = len(present) < len(parts)
+
+    if all(isinstance(p.dtype, pd.CategoricalDtype) for p in present):
+        categories = pd.Index(pd.unique(np.concatenate(
+            [p.cat.categories.to_numpy(dtype=object) for p in present])))
+        codes = np.full(total, -1, dtype=np.min_scalar_type(-len(categories) - 1))
+        start = 0
+        for part, n in zip(parts, lengths):
+            if part is not None:
+                # map this part's codes to the combined categories; -1 stays -1
+                recode = np.append(categories.get_indexer(part.cat.categories), -1)
+                np.take(recode, part.cat.codes.to_numpy(), out=codes[start:start + n])
+            start += n
+        return pd.Categorical.from_codes(codes,
+                                         dtype=pd.CategoricalDtype(categories),
+                                         validate=False)
+
+    dtypes = [p.dtype for p in present]
+    if all(isinstance(d, np.dtype) and d.kind in 'iuf' for d in dtypes):
+        dtype = np.result_type(*dtypes)
+        if missing and dtype.kind in 'iu':
+            dtype = np.dtype(np.float64)
+        fill = np.nan
+    else:
+        dtype = np.dtype(object)
+        fill = None
+
+    values = np.empty(total, dtype=dtype)
+    start = 0
+    for part, n in zip(parts, lengths):
+        if part is None:
+            values[start:start + n] = fill
+        else:
+            values[start:start + n] = part.to_numpy(dtype=dtype)
+        start += n
+
+    return values
+
+
+def combine_frames(frames: list) -> pd.DataFrame:
+    """Concatenate frames that may have different columns, or column dtypes.
+
+    The combined columns are the union of all columns, in order of first
+    appearance. Each column is allocated once, at its full length, and
+    filled from each frame (see combined_column()).
+    """
+    lengths = [len(f) for f in frames]
+    columns = list(dict.fromkeys(c for f in frames for c in f.columns))
+
+    combined = {c: combined_column([f[c] if c in f.columns else None
+                                    for f in frames], lengths)
+                for c in columns}
+
+    return pd.DataFrame(combined, index=pd.RangeIndex(sum(lengths)), copy=False)
+
+
+def read_file(path: str, prepare=None, use_cache: bool = True) -> tuple:
+    """Return (data, from_cache) for one csv file; cache it after reading.
+
+    Data read from the csv file is prepared and its dtypes optimized, so
+    the cached copy is too.
+    """
+    with ins.stage('load') as st:
+        cached = read_cached(path) if use_cache else None
+        if cached is not None:
+            st.rows_out = len(cached)
+            return cached, True
+
+        data = pd.read_csv(path)
+        if prepare is not None:
+            data = prepare(data)
+        data, _, _ = optimize_dtypes(data)
+        if use_cache:
+            write_cache(path, data)
+        st.rows_out = len(data)
+
+    return data, False
+
+
+class MultiFileLoader:
+    """
+    MultiFileLoader : reads the csv files matching a glob, in parallel.
+
+    Has the interface of ChunkedLoader: each file is one chunk, in the
+    order the files finish. combine() concatenates chunks whose columns
+    differ. Each file is cached on its own.
+
+    Attributes
+    ----------
+    path : str
+        glob pattern, e.g. 'data/site_*.csv'
+    paths : list
+        files matching the pattern
+    prepare : function
+        applied to each file's data as it is read
+    use_cache : bool
+        read from, and save to, the dataset cache
+    from_cache : bool
+        True if every file was read from the cache
+    rows_read : int
+        rows collected by poll() so far
+    done : bool
+        True when every file has been collected
+    error : Exception
+        set if reading a file failed; other files are still read
+
+    Methods
+    -------
+    start:
+        Starts reading the files.
+    first_chunk:
+        Waits for, and returns, the first file read.
+    poll:
+        Returns the files read since the last call, without waiting.
+    progress:
+        Returns the fraction of the data read.
+    save_cache:
+        Does nothing; files are cached as they are read.
+    combine:
+        Concatenates frames into one, unifying their columns.
+    """
+    def __init__(self, path,
+                       prepare=None,
+                       use_cache=True,
+                       max_workers=None,
+                       use_processes=False
+                ):
+        """
+        Inits a MultiFileLoader object.
+
+        Parameters
+        ----------
+        path : str
+            glob pattern of csv files
+        prepare : function
+            takes and returns a DataFrame; must be picklable (a module
+            level function) with use_processes
+        use_cache : bool
+            read from, and save to, the dataset cache
+        max_workers : int
+            number of files read at once; None for the pool's default
+        use_processes : bool
+            read in worker processes instead of threads
+        """
+        self.path = path
+        self.paths = sorted(glob.glob(path))
+        if not self.paths:
+            raise FileNotFoundError(f'no files match {path}')
+
+        self.prepare = prepare
+        self.use_cache = use_cache
+        self.from_cache = True
+
+        self.rows_read = 0
+        self.done = False
+        self.error = None
+
+        self.sizes = {p: os.path.getsize(p) for p in self.paths}
+        self.total_size = sum(self.sizes.values())
+        self.bytes_read = 0
+        self.remaining = len(self.paths)
+        self.lock = threading.Lock()
+        self.chunks = queue.Queue()
+
+        self.max_workers = max_workers
+        self.pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    def start(self) -> None:
+        """Start reading the files in the background."""
+        pool = self.pool_class(max_workers=self.max_workers)
+        for p in self.paths:
+            future = pool.submit(read_file, p, self.prepare, self.use_cache)
+            future.add_done_callback(lambda f, p=p: self.file_done(p, f))
+        pool.shutdown(wait=False)
+
+    def file_done(self, path: str, future) -> None:
+        """Pool callback: put a file's data on the queue; None after the last."""
+        if future.exception() is not None:
+            self.error = future.exception()
+        else:
+            data, from_cache = future.result()
+            self.from_cache = self.from_cache and from_cache
+            self.chunks.put(data)
+
+        with self.lock:
+            self.bytes_read += self.sizes[path]
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.chunks.put(None)
+
+    def first_chunk(self) -> pd.DataFrame:
+        """Wait for the first file read and return its data."""
+        chunk = self.chunks.get()
+        if chunk is None:
+            self.done = True
+            raise self.error
+
+        self.rows_read += len(chunk)
+
+        return chunk
+
+    def poll(self) -> list:
+        """Return the files read since the last call; does not wait."""
+        new_chunks = []
+        while not self.done:
+            try:
+                chunk = self.chunks.get_nowait()
+            except queue.Empty:
+                break
+
+            if chunk is None:
+                self.done = True
+            else:
+                self.rows_read += len(chunk)
+                new_chunks.append(chunk)
+
+        return new_chunks
+
+    def progress(self) -> float:
+        """Return the fraction of the data read (by file size), 0.0 to 1.0."""
+        if self.done or self.total_size == 0:
+            return 1.0
+
+        return min(1.0, self.bytes_read / self.total_size)
+
+    def save_cache(self, data: pd.DataFrame) -> None:
+        """Nothing to do: each file was cached when it was read."""
+
+    def combine(self, frames: list) -> pd.DataFrame:
+        """Return frames concatenated into one, unifying their columns."""
+        return combine_frames(frames)
+
+
+def open_dataset(path: str, prepare=None, use_cache: bool = True):
+    """Return a loader for a csv file, or for a glob of csv files."""
+    if any(ch in path for ch in '*?['):
+        return MultiFileLoader(path, prepare=prepare, use_cache=use_cache)
+
+    return ChunkedLoader(path, prepare=prepare, use_cache=use_cache)
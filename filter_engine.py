@@ -0,0 +1,282 @@
+"""
+module: filter_engine.py
+
+purpose: compile data filter criteria to a predicate, and evaluate it
+         against a pandas DataFrame as NumPy boolean masks.
+
+comments: A filter spec is a tuple of Term objects, combined with '&'. This
+          replaces building a string for DataFrame.query(), which re-parses
+          the expression on every call and needs cleaned column names.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  Add IncrementalFilter: refine the previous result when terms are
+            only added to a filter.
+            Add canonical_spec(), a cache key for a filter spec.
+10-18-2026  Evaluate terms on categorical columns over the categories, then
+            map to rows through the category codes.
+            IncrementalFilter keeps its state in one tuple, so reset() is
+            safe while a worker thread is filtering.
+10-18-2026  Add indexed_rows(): a selective term is looked up in a column
+            index (see column_index), and the other terms are evaluated only
+            over the rows it selects. IncrementalFilter uses it, building
+            indexes on first use.
+10-18-2026  A missing value in a categorical column matches '!=', as in an
+            object column and DataFrame.query(), also when looked up in a
+            CategoryIndex.
+            Compare float32 columns to a float64 value, so that results
+            match DataFrame.query() on the float64 data.
+"""
+"""
+TODO:
+"""
+
+import functools
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import column_index as ci
+
+# operator: (NumPy ufunc, equivalent pandas Series method)
+OPS = {'==': (np.equal, 'eq'),
+       '!=': (np.not_equal, 'ne'),
+       '>':  (np.greater, 'gt'),
+       '<':  (np.less, 'lt'),
+       '>=': (np.greater_equal, 'ge'),
+       '<=': (np.less_equal, 'le')}
+
+
+class Term(NamedTuple):
+    """One filter criterion: data column, operator, and value as entered."""
+    column: str
+    op: str
+    value: str
+
+
+def make_spec(terms: list) -> tuple:
+    """Return a filter spec (tuple of Terms) from (column, op, value) items."""
+    return tuple(Term(*t) for t in terms)
+
+
+def canonical_spec(spec: tuple) -> tuple:
+    """Return a key for a filter spec that ignores term order and spacing."""
+    return tuple(sorted(set(Term(t.column.strip(), t.op.strip(), t.value.strip())
+                            for t in spec)))
+
+
+def to_query(spec: tuple) -> str:
+    """Return the DataFrame.query() expression equivalent to a filter spec."""
+    terms = []
+    for t in spec:
+        quote = '' if t.value.replace('.', '', 1).isnumeric() else '"'
+        terms.append(t.column + t.op + quote + t.value + quote)
+
+    return ' & '.join(terms)
+
+
+def eval_path(dtype, op: str) -> str:
+    """Return how to evaluate a term: 'array', 'category' or 'series'.
+
+    Object (string) arrays are compared directly only for equality, since
+    ordering comparisons fail on missing values.
+    """
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'category'
+    if isinstance(dtype, np.dtype):
+        if dtype.kind in 'iuf' or (dtype.kind == 'O' and op in ['==', '!=']):
+            return 'array'
+
+    return 'series'
+
+
+def typed_value(value: str, dtype) -> int | float | str:
+    """Convert a criterion value to the type of the data column.
+
+    The value for a float column is a np.float64, so NumPy compares a
+    float32 column at float64 precision, as DataFrame.query() does.
+    """
+    if not pd.api.types.is_numeric_dtype(dtype):
+        return value
+    if dtype.kind == 'f':
+        return np.float64(value)
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+@functools.lru_cache(maxsize=128)
+def compile_filter(spec: tuple, dtypes: tuple) -> tuple:
+    """Compile a filter spec for columns of the given dtypes.
+
+    Returns a tuple of (column, op, typed value, eval path) steps. The
+    result is cached per spec, so re-applying a filter does no parsing.
+    """
+    steps = []
+    for term, dtype in zip(spec, dtypes):
+        steps.append((term.column,
+                      term.op,
+                      typed_value(term.value, dtype),
+                      eval_path(dtype, term.op)))
+
+    return tuple(steps)
+
+
+def filter_mask(data: pd.DataFrame, spec: tuple) -> np.ndarray:
+    """Evaluate a filter spec, returning a boolean mask of matching rows."""
+    dtypes = tuple(data[t.column].dtype for t in spec)
+    steps = compile_filter(spec, dtypes)
+
+    mask = np.ones(len(data), dtype=bool)
+    term_mask = np.empty(len(data), dtype=bool)
+
+    for column, op, value, path in steps:
+        ufunc, method = OPS[op]
+        if path == 'array':
+            ufunc(data[column].to_numpy(), value, out=term_mask)
+        elif path == 'category':
+            # compare each category once; code -1 (missing) matches only
+            # '!=', as for an object column
+            col = data[column]
+            matched = ufunc(col.cat.categories.to_numpy(), value)
+            matched = np.append(matched, op == '!=')
+            np.take(matched, col.cat.codes.to_numpy(), out=term_mask)
+        else:
+            result = getattr(data[column], method)(value)
+            term_mask[:] = result.to_numpy(dtype=bool, na_value=False)
+
+        np.logical_and(mask, term_mask, out=mask)
+        if not mask.any():
+            break
+
+    return mask
+
+
+def filter_frame(data: pd.DataFrame, spec: tuple) -> pd.DataFrame:
+    """Return the rows of a DataFrame that match a filter spec."""
+    return data[filter_mask(data, spec)]
+
+
+def refine_rows(data: pd.DataFrame, rows: np.ndarray, spec: tuple) -> np.ndarray:
+    """Return the positions in rows that also match a filter spec.
+
+    Only the columns named in the spec are read, for the given rows.
+    """
+    if not spec:
+        return rows
+
+    columns = list(dict.fromkeys(t.column for t in spec))
+    col_posns = [data.columns.get_loc(c) for c in columns]
+
+    return rows[filter_mask(data.iloc[rows, col_posns], spec)]
+
+
+def indexed_rows(data: pd.DataFrame,
+                 spec: tuple,
+                 indexes: ci.ColumnIndexes,
+                 max_fraction: float = 0.05) -> np.ndarray | None:
+    """Return positions of the rows that match a filter spec, using an index.
+
+    The term that selects the fewest rows, by index, is looked up; the
+    other terms are checked only for those rows. Returns None if no term
+    selects at most max_fraction of the rows; a full scan is faster then.
+    """
+    dtypes = tuple(data[t.column].dtype for t in spec)
+    steps = compile_filter(spec, dtypes)
+
+    best = None
+    for term, (column, op, value, path) in zip(spec, steps):
+        if path not in ['array', 'category']:
+            continue
+        index = indexes.get(data, column)
+        if index is None:
+            continue
+
+        if path == 'category':
+            slices = index.slices(OPS[op][0](index.categories, value),
+                                  missing=(op == '!='))
+        else:
+            slices = index.slices(op, value)
+
+        n = index.count(slices)
+        if best is None or n < best[0]:
+            best = (n, term, index, slices)
+
+    if best is None or best[0] > max_fraction * len(data):
+        return None
+
+    _, term, index, slices = best
+    rows = index.rows(slices)
+
+    return refine_rows(data, rows, tuple(t for t in spec if t != term))
+
+
+class IncrementalFilter:
+    """
+    IncrementalFilter : keeps the result of the last filter, to refine it.
+
+    When a new filter spec contains every term of the previous one, plus
+    more, only the new terms are evaluated, and only over the rows that
+    matched the previous filter. Otherwise, a selective term is looked up
+    in a column index, if use_indexes is set.
+
+    Attributes
+    ----------
+    last : tuple
+        (data, spec, rows) of the last filter: the dataset, the filter
+        spec, and positions of the rows that matched. Replaced as a whole,
+        so another thread never sees a partial update.
+    indexes : column_index.ColumnIndexes
+        column indexes, built when a column is first filtered; None if
+        indexes are not used
+
+    Methods
+    -------
+    apply:
+        Returns positions of the rows that match a filter spec.
+    reset:
+        Forgets the last filter.
+    """
+    def __init__(self, use_indexes=True):
+        """
+        Inits an IncrementalFilter object, with no previous filter.
+
+        Parameters
+        ----------
+        use_indexes : bool
+            look up selective terms in column indexes
+        """
+        self.indexes = ci.ColumnIndexes() if use_indexes else None
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the last filter, so the next one starts from all rows."""
+        self.last = (None, (), None)
+
+    def apply(self, data: pd.DataFrame, spec: tuple) -> np.ndarray:
+        """Return positions of the rows of data that match a filter spec."""
+        last_data, last_spec, last_rows = self.last
+        old_terms = set(last_spec)
+        new_terms = set(spec)
+
+        if data is last_data and old_terms == new_terms:
+            return last_rows
+
+        rows = None
+        if data is last_data and old_terms < new_terms:
+            added = tuple(t for t in spec if t not in old_terms)
+            rows = refine_rows(data, last_rows, added)
+        elif self.indexes is not None:
+            rows = indexed_rows(data, spec, self.indexes)
+
+        if rows is None:
+            rows = np.flatnonzero(filter_mask(data, spec))
+
+        self.last = (data, spec, rows)
+
+        return rows
@@ -0,0 +1,369 @@
+"""
+module: instrument.py
+
+purpose: measure the stages of the data work -- load, filter compile,
+         filter eval, stats, render, plot prep, plot draw -- for the timing
+         panel and a JSON trace file; and profile the application with
+         cProfile.
+
+comments: Recording is off until enable() is called. When off, stage()
+          returns a shared, do-nothing context manager, and functions
+          decorated with traced() are called directly, so the cost is one
+          attribute test.
+
+          Each record has the wall time, the rows in and out (if known),
+          and, with enable(memory=True), the memory allocated: net and
+          peak, from tracemalloc. tracemalloc slows every allocation, and
+          its counters are shared by all threads, so memory of stages that
+          overlap (on the Tk thread and a worker) is approximate.
+
+          The trace file is in the Chrome trace event format; open it in
+          chrome://tracing or ui.perfetto.dev.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+"""
+
+import cProfile
+import collections
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+STAGES = ['load', 'filter compile', 'filter eval', 'stats', 'render',
+          'plot prep', 'plot draw']
+
+
+def rows_of(obj) -> int | None:
+    """Return the number of rows of a DataFrame, StoreView or array, else None."""
+    if hasattr(obj, 'iloc') or hasattr(obj, 'ndim'):
+        return len(obj)
+
+    return None
+
+
+class NullStage:
+    """
+    NullStage : stands in for a Stage when recording is off.
+
+    rows_out may be set, as for a Stage; it is ignored.
+    """
+    __slots__ = ('rows_in', 'rows_out')
+
+    def __init__(self):
+        self.rows_in = None
+        self.rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+class Stage:
+    """
+    Stage : a context manager that records one run of a stage.
+
+    Attributes
+    ----------
+    tracer : Tracer
+        receives the record when the stage ends
+    name : str
+        stage name, e.g. 'filter eval'
+    rows_in : int
+        rows the stage started with, or None
+    rows_out : int
+        rows the stage produced; may be set in the body of the with
+    """
+    __slots__ = ('tracer', 'name', 'rows_in', 'rows_out', 't0', 'mem0')
+
+    def __init__(self, tracer, name, rows_in=None):
+        """
+        Inits a Stage object.
+
+        Parameters
+        ----------
+        tracer : Tracer
+        name : str
+        rows_in : int
+        """
+        self.tracer = tracer
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.mem0 = None
+
+    def __enter__(self):
+        if self.tracer.memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self.mem0 = tracemalloc.get_traced_memory()[0]
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter()
+        mem = peak = None
+        if self.mem0 is not None and tracemalloc.is_tracing():
+            current, peak_now = tracemalloc.get_traced_memory()
+            mem = current - self.mem0
+            peak = peak_now - self.mem0
+
+        thread = threading.current_thread()
+        self.tracer.add({'name': self.name,
+                         'start': self.t0 - self.tracer.t_start,
+                         'ms': (t1 - self.t0) * 1e3,
+                         'rows_in': self.rows_in,
+                         'rows_out': self.rows_out,
+                         'mem': mem,
+                         'peak': peak,
+                         'thread': thread.name,
+                         'tid': thread.ident,
+                         'error': exc[0] is not None})
+        return False
+
+
+class Tracer:
+    """
+    Tracer : keeps records of recent stages, in a ring buffer.
+
+    Attributes
+    ----------
+    enabled : bool
+        True while recording
+    memory : bool
+        True while memory is measured
+    records : collections.deque
+        the most recent records, oldest first
+    count : int
+        records added since creation; shows when there are new ones
+
+    Methods
+    -------
+    enable:
+        Starts recording.
+    disable:
+        Stops recording.
+    stage:
+        Returns a context manager that records one run of a stage.
+    traced:
+        Decorator: records each call of a function as a stage.
+    recent:
+        Returns a copy of the most recent records.
+    summary:
+        Returns per-stage counts and times.
+    write_trace:
+        Writes the records to a JSON trace file.
+    """
+    def __init__(self, maxlen=1000):
+        """
+        Inits a Tracer object.
+
+        Parameters
+        ----------
+        maxlen : int
+            number of records kept
+        """
+        self.enabled = False
+        self.memory = False
+        self.records = collections.deque(maxlen=maxlen)
+        self.count = 0
+        self.lock = threading.Lock()
+        self.t_start = time.perf_counter()
+        self.started_tracemalloc = False
+
+    def enable(self, memory: bool = False) -> None:
+        """Start recording; with memory, also measure allocated memory."""
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        self.memory = memory
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording. Records are kept."""
+        self.enabled = False
+        self.memory = False
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+    def stage(self, name: str, rows_in: int | None = None):
+        """Return a context manager that records a run of stage name."""
+        if not self.enabled:
+            return NULL_STAGE
+
+        return Stage(self, name, rows_in)
+
+    def traced(self, name: str):
+        """Decorator: record each call of a function as a run of stage name.
+
+        Rows in and out are taken from the first argument and the result,
+        if they are DataFrames or arrays.
+        """
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+
+                with Stage(self, name, rows_of(args[0]) if args else None) as st:
+                    result = fn(*args, **kwargs)
+                    st.rows_out = rows_of(result)
+                return result
+
+            return wrapper
+
+        return decorate
+
+    def add(self, record: dict) -> None:
+        """Add a record; the oldest is dropped when the buffer is full."""
+        with self.lock:
+            self.records.append(record)
+            self.count += 1
+
+    def recent(self, n: int | None = None) -> list:
+        """Return a copy of the n most recent records (all, if None)."""
+        with self.lock:
+            records = list(self.records)
+
+        return records if n is None else records[-n:]
+
+    def summary(self) -> dict:
+        """Return {stage: {n, last_ms, mean_ms, max_ms}} over the records kept."""
+        times = {}
+        for record in self.recent():
+            times.setdefault(record['name'], []).append(record['ms'])
+
+        return {name: {'n': len(ms),
+                       'last_ms': ms[-1],
+                       'mean_ms': sum(ms) / len(ms),
+                       'max_ms': max(ms)}
+                for name, ms in times.items()}
+
+    def write_trace(self, path: str) -> None:
+        """Write the records kept to path, in the Chrome trace event format."""
+        pid = os.getpid()
+        records = self.recent()
+        events = []
+        threads = {}
+        for record in records:
+            threads[record['tid']] = record['thread']
+            events.append({'name': record['name'],
+                           'cat': 'stage',
+                           'ph': 'X',
+                           'ts': record['start'] * 1e6,
+                           'dur': record['ms'] * 1e3,
+                           'pid': pid,
+                           'tid': record['tid'],
+                           'args': {k: record[k] for k in
+                                    ('rows_in', 'rows_out', 'mem', 'peak', 'error')}})
+        for tid, thread_name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid,
+                           'tid': tid, 'args': {'name': thread_name}})
+
+        with open(path, 'w') as fh:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fh)
+
+
+class Profiler:
+    """
+    Profiler : cProfile for the Tk thread and the worker threads.
+
+    Before Python 3.12, a cProfile.Profile sees only the thread that
+    enabled it, so each thread gets its own, and the report merges them.
+    From 3.12, one Profile sees every thread, and wrap() does nothing.
+
+    Methods
+    -------
+    enable:
+        Starts profiling the calling thread.
+    disable:
+        Stops profiling the calling thread.
+    wrap:
+        Returns a function that runs under this thread's profile.
+    report:
+        Writes the merged statistics to a file, and returns the top lines.
+    """
+    def __init__(self):
+        """Inits a Profiler object."""
+        self.local = threading.local()
+        self.profiles = []
+        self.lock = threading.Lock()
+
+    def profile(self) -> cProfile.Profile:
+        """Return the calling thread's profile; create it if needed."""
+        profile = getattr(self.local, 'profile', None)
+        if profile is None:
+            profile = cProfile.Profile()
+            self.local.profile = profile
+            with self.lock:
+                self.profiles.append(profile)
+
+        return profile
+
+    def enable(self) -> None:
+        self.profile().enable()
+
+    def disable(self) -> None:
+        self.profile().disable()
+
+    def wrap(self, fn):
+        """Return fn, run with profiling on in the thread that calls it."""
+        if sys.version_info >= (3, 12):
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = self.profile()
+            profile.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+
+        return wrapper
+
+    def report(self, path: str | None = None,
+               top: int = 25,
+               sort: str = 'cumulative') -> str:
+        """Merge the profiles; write them to path (for pstats or snakeviz)
+        if given; return the top functions, as printed by pstats."""
+        out = io.StringIO()
+        with self.lock:
+            profiles = list(self.profiles)
+
+        stats = pstats.Stats(profiles[0], stream=out)
+        for profile in profiles[1:]:
+            stats.add(profile)
+        if path:
+            stats.dump_stats(path)
+        stats.sort_stats(sort).print_stats(top)
+
+        return out.getvalue()
+
+
+# the application's tracer; modules record stages with ins.stage(), ins.traced()
+tracer = Tracer()
+
+
+def stage(name: str, rows_in: int | None = None):
+    """Return a context manager that records a run of stage name."""
+    return tracer.stage(name, rows_in)
+
+
+def traced(name: str):
+    """Decorator: record each call of a function as a run of stage name."""
+    return tracer.traced(name)
@@ -54,6 +54,97 @@ history:
             filter_spec_fr (to main_list_fr).
             Import UI module using SourceFileLoader.
             Update associated README.md file.
+10-18-2026  Display data with custui.DataFrameText, which formats only the
+            visible rows (plus a buffer) as the scrollbar moves, instead of
+            inserting the whole DataFrame string.
+            make_filter() returns a filter spec (tuple of filter_engine.Term)
+            instead of a query() string. apply_filter() evaluates the spec
+            as NumPy boolean masks, with the compiled predicate cached.
+            Keep the last filter result in last_filter. A filter that only
+            adds terms is evaluated over the rows that already matched.
+            Cache statistics tables in stats_cache, keyed by data_version
+            and the canonical filter spec. See data_stats().
+            Compute statistics with stats_engine.agg_stats(), in one pass
+            per column, instead of DataFrame.agg().
+            Load the dataset in chunks with data_loader.ChunkedLoader. The
+            first chunk is displayed right away; poll_loader() appends the
+            rest, with progress in the status bar and running statistics.
+            A filter applied while loading is applied again to the whole
+            dataset when loading is done.
+            Button callbacks read data_1 when called, not when defined.
+            Cache the loaded dataset on disk (see data_loader); later
+            launches read the cache until the csv file changes.
+            When loading is done, downcast numeric dtypes and convert
+            low-cardinality text columns to category. make_filter() and
+            stats_dict test dtypes by kind, not by name.
+            Run filtering, statistics and plot preparation on a worker
+            thread (workers.TaskRunner); results are displayed from the Tk
+            event loop. A new request supersedes a pending one. The status
+            bar shows busy/idle.
+            Plot from NumPy arrays of the plotted columns only (plot_data),
+            sorted by an argsort index into reused buffers, instead of
+            copying and sorting the whole DataFrame.
+            Decimate large line and scatter plots to a point budget (see
+            line_point_budget, scatter_point_budget); the plot title says
+            so. Optionally draw dense scatter plots as a hexbin.
+            Bar plots aggregate y per x group (numeric x is binned) with a
+            selectable function; results are cached in bar_cache, by the
+            version of the plotted view (published with the view).
+            Draw plots in one embedded, reused canvas (plot_canvas), next
+            to the plot controls, instead of a new pyplot window per plot.
+            Plot buttons plot the displayed (filtered) data, not data_1. The
+            current plot follows filter changes: show_filtered() and
+            show_unfiltered() publish the new view (view_publisher), and
+            the plot re-prepares its data and updates in place. Bursts of
+            changes are debounced (plot_update_ms). Plot data passed to
+            the Tk thread is never a view of the reused plot buffers.
+            Cache filter results (row positions) in filter_cache, keyed by
+            data_version and the canonical filter spec, so switching back
+            to a recent filter does not re-evaluate it. The cache is
+            bounded by memory (filter_cache_mb). Debug output shows the
+            cache hit rates.
+            Move clean_column_names(), validate_criterion(), make_filter()
+            and the filtering and stats column choice to data_engine, which
+            does not use tkinter. make_filter() there takes (column,
+            criterion) pairs; filter_criteria() reads them from the filter
+            rows. For batch use without the UI, see batch.py.
+            Faster startup: matplotlib and plot_canvas are imported on the
+            first plot (get_plot_canvas()). The plot controls are built
+            when first shown (build_plot_ui()), and the scatter controls
+            when first opened (build_scatter_ui()).
+            data_path may be a glob: the files are read in parallel and
+            combined, with the union of their columns (see
+            data_loader.open_dataset()). When loading is done, the
+            column list and the statistics columns are updated.
+            Out-of-core mode (out_of_core): the dataset is kept on disk in
+            chunks (chunk_store). Filters and statistics read the chunks;
+            the data window and plots read only the rows they show. Use
+            de.stats_table() and de.count_rows(), which take either a
+            DataFrame or a chunk_store.StoreView. The startup statistics
+            are computed on a worker thread (refresh_stats()).
+            Record the time, rows and memory of each stage of the data
+            work (instrument), instead of the do_debug print statements in
+            the data functions. The 'timing...' button shows recent stage
+            timings and cache summaries. With do_trace, recording starts
+            at startup and the records are written to trace_file on quit.
+            do_profile profiles the session with cProfile, instead of
+            listing function signatures; see profile_file. The do_debug
+            flag, its print statements and chkb_extra() are removed; a
+            missing scatter category list is reported in the status bar.
+            Format the statistics table with table_text.TableFormatter
+            (stats_float_format), instead of str(DataFrame) inside
+            pd.option_context(); the data window uses it too.
+            The statistics window is a custui.LineText: a new table replaces
+            only the lines that changed, and style_df_text() sets tag
+            rules, applied with one tag_add per tag, instead of tagging
+            each row.
+            Statistics by group: the 'group by' selector of the statistics
+            panel shows the statistics (and count) of each value of a
+            category column, computed in one pass (stats_engine.
+            grouped_agg_stats()). stats_cache keys include the group
+            column. Not available in out-of-core mode. Grouped statistics
+            are shown only for the displayed data and the selected group
+            (refresh_stats()).
 """
 """
 TODO:
@@ -75,37 +166,108 @@ import tkinter as tk
 from tkinter import ttk
 # import tkinter.font as tkfont
 from importlib.machinery import SourceFileLoader
-# to get function name and caller, for debug
-import sys
 
 import pandas as pd
 # import numpy as np
-import matplotlib.pyplot as plt
 
 import rf_custom_ui as custui
+import chunk_store as cs
+import data_engine as de
+import filter_engine as fe
+import stats_engine as se
+import table_text as tt
+import data_loader as dl
+import instrument as ins
+import workers as wk
+import plot_data as pdata
+# plot_canvas (and matplotlib) is imported by get_plot_canvas(), when needed
 # import multi_select as msel
 
 msel = SourceFileLoader("ui_multi_select", "../ui_RF/ui_multi_select.py").load_module()
 styles_ttk = SourceFileLoader("styles_ttk", "../styles/styles_ttk.py").load_module()
 
-do_debug = False      # turn on print statements for debug
-do_profile = False    # report function signatures
+do_trace = False      # record stage timings from startup (or use the panel)
+trace_memory = False  # also record memory allocated by each stage (slower)
+trace_file = 'trace.json'     # written on quit, if stages were recorded
+do_profile = False    # profile the session with cProfile
+profile_file = 'main.prof'    # written on quit; read with pstats or snakeviz
+
+profiler = ins.Profiler() if do_profile else None
+if profiler is not None:
+    profiler.enable()
+if do_trace:
+    ins.tracer.enable(memory=trace_memory)
 
 """ 
 ----------------------------
 widget interaction functions
 ----------------------------
 """
-def style_df_text(win: object, itemlist: list=['test']) -> None:
-    """Apply text styling to a pandas DataFrame displayed in a Text widget."""
-    win.tag_add('bolded', '1.0', '1.end')
+def style_df_text(win: custui.LineText, itemlist: list=['test'],
+                  ngroups: int = 0) -> None:
+    """Apply text styling to a pandas DataFrame displayed in a LineText widget.
+
+    Bolds the header line, and the first word (the row label) of the
+    itemlist rows that follow it. With ngroups, the rows are in ngroups
+    blocks, each after a group heading line, which is bolded.
+    """
+    if not ngroups:
+        win.set_tag_rules([('bolded', 1, 1, 'line'),
+                           ('bolded', 2, len(itemlist) + 1, 'word')])
+        return
+
+    rules = [('bolded', 1, 1, 'line')]
+    block = len(itemlist) + 1
+    for g in range(ngroups):
+        heading = 2 + g * block
+        rules += [('bolded', heading, heading, 'line'),
+                  ('bolded', heading + 1, heading + len(itemlist), 'word')]
+    win.set_tag_rules(rules)
+
 
-    for e in range(2, len(itemlist) + 2):
-        row = str(format(e, '0.1f'))
-        strend = row + ' wordend'
-        win.tag_add('bolded', row, strend)
+def set_stats_group(event=None) -> None:
+    """Combobox callback: show statistics by group, or for all rows."""
+    global stats_group
 
-    win.configure(state='disabled')
+    choice = stats_group_var.get()
+    stats_group = None if choice == 'none' else choice
+
+    refresh_stats(data_current, current_spec, current_version, windows)
+
+
+def refresh_stats(data: pd.core.frame.DataFrame,
+                  spec: tuple,
+                  version: int,
+                  windows: dict) -> None:
+    """Show the statistics of the displayed data, grouped by stats_group.
+
+    They are computed on a worker thread (or found in stats_cache). The
+    result is not shown if, by then, other data is displayed or the group
+    has changed.
+    """
+    group = stats_group
+
+    def show(stats_agg):
+        if data is data_current and group == stats_group:
+            show_stats(stats_agg, windows)
+
+    runner.submit('stats', lambda: data_stats(data, spec, version, group),
+                  callback=show)
+
+
+def update_group_choices(data: pd.core.frame.DataFrame) -> None:
+    """Set the columns offered by the 'group by' selector.
+
+    If the selected column is no longer offered, statistics are no longer
+    grouped.
+    """
+    global stats_group
+
+    choices = de.group_columns(data)
+    stats_group_cb.configure(values=['none'] + choices)
+    if stats_group not in choices:
+        stats_group = None
+        stats_group_var.set('none')
 
 
 def set_use_category(varname: str) -> None:
@@ -114,234 +276,272 @@ def set_use_category(varname: str) -> None:
     Selects a row in the corresponding Listbox.
     """
     do_cat = use_category.get()
-    do_cat_test = scatter_setup_fr.getvar(name=varname)
 
     if int(do_cat) == 1:
-        print('selecting category from list...')
         category_lb.select_clear(0)
         category_lb.select_set(1)
     else:
         category_lb.select_clear(1)
         category_lb.select_set(0)
 
-    if do_debug:
-        print(f'in function: {sys._getframe().f_code.co_name}')
-        print(f'...called by: {sys._getframe().f_back.f_code.co_name}')
-        print(f'   do_cat: {do_cat}')
-        print(f'   do_cat_test: {do_cat_test}')
-
-
-def chkb_extra(ev):
-    print('in chkb_extra...')
-    print(f'   ev: {ev}')
-
 
 def set_status(status_msg):
     # print('in set_status...')
     status_txt.set(status_msg)
 
 
+def set_busy(state: str) -> None:
+    """TaskRunner callback: show 'busy' or 'idle' in the status bar."""
+    busy_txt.set(state)
+
+
+def show_task_error(err: Exception) -> None:
+    """TaskRunner callback: report an error raised by background work."""
+    set_status(f'Error: {err}')
+
+
+def show_timing_panel() -> None:
+    """Open the timing panel, or raise it if open."""
+    global timing_panel
+
+    if timing_panel is not None and timing_panel.winfo_exists():
+        timing_panel.lift()
+        return
+
+    timing_panel = custui.TimingPanel(root, tracer=ins.tracer,
+                                      info=[filter_cache.summary,
+                                            stats_cache.summary,
+                                            bar_cache.summary])
+
+
+def quit_app() -> None:
+    """Stop background work, and close the application.
+
+    Writes the stage records to trace_file and the profile to profile_file,
+    if there are any.
+    """
+    runner.shutdown()
+
+    if trace_file and ins.tracer.count:
+        ins.tracer.write_trace(trace_file)
+    if profiler is not None:
+        profiler.disable()
+        print(profiler.report(profile_file))
+
+    root.destroy()
+
+
 """ 
 --------------------------
 data interaction functions
 --------------------------
 """
-def clean_column_names(df: pd.core.frame.DataFrame) -> pd.core.frame.DataFrame:
-    """Convert single spaces in column names to underscore character."""
-
-    cols0 = df.columns
-    cols1 = cols0.map(lambda x: x.replace(' ', '_') if isinstance(x, str) else x)
-    df.columns = cols1
-
-    return df
-
-
 def data_filter(data: pd.core.frame.DataFrame, 
                 windows: dict,
                 filters: list) -> None:
     """Manage the construction and implementation of a dataset filter."""
-    expr = make_filter(data, filters)
-    print(f'in data_filter, expr is {expr}')
-    if expr not in [-1, -2, -3, -4]:
-        apply_filter(data, expr, windows)
+    spec = de.make_filter(data, filter_criteria(filters), report=set_status)
+    if spec not in [-1, -2, -3, -4]:
+        apply_filter(data, spec, windows)
     else:
-        match expr:
-            case -1:
-                set_status(f'Invalid filter operator; use: =, ==, >, <, >=, <=')
+        match spec:
             case -2:
                 data_unfilter(data, windows)
-                set_status('No filter defined.')
-            case -3:
-                # e.g. 'age' + '&55', or 'age' + 'older'
-                set_status("Can\'t compare text to numeric data.")
-            case -4:
-                # e.g. 'gender' + '>55'
-                set_status("Can\'t compare number to text data.")
+                set_status(de.FILTER_ERRORS[spec])
             case _ :
-                apply_filter(data, expr, windows)
+                # -3: e.g. 'age' + '&55', or 'age' + 'older'
+                # -4: e.g. 'gender' + '>55'
+                set_status(de.FILTER_ERRORS[spec])
 
 
-def make_filter(data: pd.core.frame.DataFrame, filt_rows: list) -> int | str:
-    """Construct a data filter for a pandas DataFrame.
-    module variables
-    """
-    dcolumn = []
+def filter_criteria(filt_rows: list) -> list:
+    """Return the (column, criterion) pair entered in each filter row."""
     criteria = []
-    terms = []
-    quote = ''
-    err = 0      # False == no error
-    q_expression = ''
-
-    for i in range(len(filt_rows)):
-        current_term = ''
-
-        this_filter = filt_rows[i].winfo_children()[0].get()
-        this_criterion = filt_rows[i].winfo_children()[1].get()
-        
-        if this_filter != '' and this_criterion != '':
-            dcolumn.append(this_filter)
-            criteria.append(this_criterion)
-
-            current_criterion = len(criteria) - 1
-            validated_entry = validate_criterion(criteria[current_criterion],
-                                                 this_filter)
-            the_op = validated_entry['op']
-            the_value = validated_entry['value']
-            data_type = data[this_filter].dtype
-            print(f'\ndata_type is {data_type}')
-
-            if validated_entry['value'] != '':
-    
-                # test for numeric value.
-                # ...int or float will pass
-                # if validated_entry['value'].replace('.', '', 1).isnumeric():
-                if the_value.replace('.', '', 1).isnumeric():
-                    if data_type == 'object':
-                        err = -4
-                    quote = ''
-                else:
-                    # value to check is not numeric, see if data is numeric
-                    if data_type == 'int64' or data_type == 'float64':
-                        err = -3
-                    quote = '\"'
-                    
-                current_term = dcolumn[current_criterion] + the_op + quote + the_value + quote
-            else:
-                # Not a valid filter criterion
-                err = -1
-                print(f'not valid: {this_criterion}')
-
-            terms.append(current_term)
-
-    if len(terms) == 0:
-        # No filter defined
-        err = -2
-    
-    if do_debug:
-        print(f'in function: {sys._getframe().f_code.co_name}')
-        print(f'...called by: {sys._getframe().f_back.f_code.co_name}')
-        print(f'filt, crit: {this_filter}, {this_criterion}')
-        print()
-        print(f'column {this_filter} contains type: {data_type}')
-        print(data_type in ['str', 'object', 'int64'])
-        print(f'q_expression string: {repr(q_expression)}')
-        print()
-
-    if err:
-        print(f'make_filter, returning {err}')
-
-        return err
-    else:
-        print(f'make_filter, returning {q_expression}')
-        for t in terms:
-            q_expression += (t + ' & ')
-        q_expression = q_expression[:-3]
+    for row in filt_rows:
+        this_filter = row.winfo_children()[0].get()
+        this_criterion = row.winfo_children()[1].get()
+        criteria.append((this_filter, this_criterion))
+
+    return criteria
 
-        return q_expression
 
+def apply_filter(data: pd.core.frame.DataFrame, 
+                 spec: tuple, 
+                 windows: dict) -> None:
+    """Apply a data filter to a pandas DataFrame.
 
-def validate_criterion(input: list, data_column: int) -> dict:
-    """Validate user-entered criterion for filtering data."""
-    char1 = input[0]
-    if len(input) > 1:
-        char2 = input[1]
+    The filter spec is compiled once, and each term is evaluated as a
+    boolean mask over one column, like: df[col] > 55. If the spec only adds
+    terms to the last filter, just the rows that matched it are checked.
+    Matching rows of recent filters are kept in filter_cache.
+
+    Runs on a worker thread; show_filtered() displays the result.
+    """
+    version = data_version
+    key = (version, fe.canonical_spec(spec))
+    group = stats_group
+
+    def work():
+        rows = filter_cache.lookup(key,
+                                   lambda: de.filter_rows(data, spec, last_filter))
+        data_current = data.iloc[rows]
+        return (data_current,
+                data_stats(data_current, spec, version, group),
+                de.count_rows(data_current))
+
+    runner.submit('view', work,
+                  callback=lambda result: show_filtered(*result, windows, spec,
+                                                        group, version))
+
+
+def data_stats(data: pd.core.frame.DataFrame,
+               spec: tuple,
+               version: int,
+               group: str | None = None) -> pd.core.frame.DataFrame:
+    """Return the statistics table for data selected by a filter spec.
+
+    Tables are cached by dataset version, canonical filter spec and group
+    column; an empty spec means the whole dataset. With a group column,
+    the table has the count and statistics of each group.
+    """
+    key = (version, fe.canonical_spec(spec), group)
+    if group is None:
+        compute = lambda: de.stats_table(data, stats_dict)
     else:
-        char2 = ''
-    op = ''
-    value = ''
-    msg = ''
-    
-    criterion = {'op': op,
-                 'value': value}
+        group_dict = {c: ['count'] + sl for c, sl in stats_dict.items()}
+        compute = lambda: de.stats_table(data, group_dict, by=group)
+    stats_agg = stats_cache.lookup(key, compute)
+
+    return stats_agg
+
+
+def show_stats(stats_agg: pd.core.frame.DataFrame,
+               windows: dict) -> None:
+    """Display a statistics table in the stats window.
+
+    A table by group (indexed by group and statistic) is shown as a block
+    of rows for each group, under a heading; all blocks have the same
+    column widths.
+    """
+    if not isinstance(stats_agg.index, pd.MultiIndex):
+        header, rows = tt.TableFormatter(stats_agg, stats_float_format).lines()
 
-    if char1 in ['!', '=', '>', '<']:
-        if char2 == '=':
-                value = input[2:]
-                op = input[0:2]
+        style_df_text(windows["stats"], stat_list)
+        windows["stats"].show_lines(header + rows)
+        return
+
+    group = stats_agg.index.names[0]
+    labels = stats_agg.index.get_level_values(0).unique()
+    header, rows = tt.TableFormatter(stats_agg.droplevel(0),
+                                     stats_float_format).lines()
+    nstats = len(rows) // max(len(labels), 1)
+
+    lines = list(header)
+    for g, label in enumerate(labels):
+        lines.append(f'{group} = {label}')
+        lines += rows[g * nstats:(g + 1) * nstats]
+
+    style_df_text(windows["stats"], rows[:nstats], ngroups=len(labels))
+    windows["stats"].show_lines(lines)
+
+
+def poll_loader(loader: dl.ChunkedLoader | dl.MultiFileLoader,
+                windows: dict) -> None:
+    """Collect chunks read by the background loader; update the display.
+
+    Runs from the Tk event loop (root.after) until loading is done. data_1
+    is re-assembled only when its size has doubled, so the total copying
+    stays linear in the number of rows. Chunks are files, for a glob of
+    files; loader.combine() unifies their columns.
+    """
+    global data_1, data_current, data_version, current_version, stats_dict
+
+    chunks = loader.poll()
+    for chunk in chunks:
+        running_stats.update(chunk)
+    loaded_chunks.extend(chunks)
+
+    memory_msg = ''
+    if loader.done and not loader.from_cache and loader.error is None:
+        # dtypes are optimized once all chunks are in, so that categories
+        # are the same for every chunk
+        data_1 = loader.combine([data_1] + loaded_chunks)
+        loaded_chunks.clear()
+        data_1, mem_before, mem_after = dl.optimize_dtypes(data_1)
+        memory_msg = (f' Memory: {mem_before / 2**20:.1f} MB -> '
+                      f'{mem_after / 2**20:.1f} MB.')
+        data_version += 1
+        last_filter.reset()
+
+        if not current_spec:
+            data_current = data_1
+            current_version = data_version
+    elif loaded_chunks and (loader.done or loader.rows_read >= 2 * len(data_1)):
+        data_1 = loader.combine([data_1] + loaded_chunks)
+        loaded_chunks.clear()
+        data_version += 1
+        last_filter.reset()
+
+        if not current_spec:
+            data_current = data_1
+            current_version = data_version
+            windows["data"].set_frame(data_1, header_tag='bluetext')
+
+    if loader.done:
+        # files of a glob may add columns
+        data_columns[:] = list(data_1.columns)
+        stats_dict = de.stats_columns(data_1, stat_list)
+        update_group_choices(data_1)
+
+        loader.save_cache(data_1)
+        if not current_spec:
+            data_unfilter(data_1, windows)
         else:
-            value = input[1:]
-            match char1:
-                case '!': 
-                    op = '!='
-                case '=': 
-                    op = '=='
-                case _  : 
-                    op = char1
+            # a filter applied while loading saw only part of the data
+            apply_filter(data_1, current_spec, windows)
+        if loader.error is not None:
+            set_status(f'Error reading {loader.path}: {loader.error}')
+        else:
+            source = 'cache' if loader.from_cache else 'csv file'
+            set_status(f'Loaded {loader.rows_read:,} rows from {source}.'
+                       + memory_msg)
     else:
-        op = '=='
-        msg = f'setting filter to match "{input}"'
-        value = input
-
-    criterion['op'] = op
-    criterion['value'] = value
-
-    if do_debug:
-        print(f'in function: {sys._getframe().f_code.co_name}')
-        print(f'...called by: {sys._getframe().f_back.f_code.co_name}')
-        print(f'vallidate input: {input}')
-        print()
-        print(f'char1, char2: {char1}, {char2}')
-        if char1 not in ['!', '=', '>', '<']:
-            print(f'setting filter criterion to: {data_column} '==' {value}')
-        print(f'validated op, value: {op}, {value}')
-        print('---------')
-        print()
-
-    set_status(msg)
-    
-    return criterion
-    
+        if chunks and not current_spec and stats_group is None:
+            # the median is filled in when loading is done
+            show_stats(running_stats.table(stat_list), windows)
+            stat_n_lab.configure(text=f'n = {loader.rows_read}')
+        set_status(f'Loading {loader.path}: {loader.progress():.0%}, '
+                   f'{loader.rows_read:,} rows')
+        root.after(100, poll_loader, loader, windows)
 
-def apply_filter(data: pd.core.frame.DataFrame, 
-                 expr: str, 
-                 windows: dict) -> None:
-    """Apply a data filter to a pandas DataFrame.
 
-    The query() function requires cleaning column names. Another method
-    is to use a series of terms like: df[col] > 55.
+@ins.traced('render')
+def show_filtered(data: pd.core.frame.DataFrame, 
+                  stats_agg: pd.core.frame.DataFrame,
+                  n: int,
+                  windows: dict,
+                  spec: tuple,
+                  group: str | None,
+                  version: int) -> None:
+    """Display results of filtering a dataset, and publish the new view.
+
+    stats_agg is grouped by group; if the statistics group was changed
+    while filtering, the statistics are computed again.
     """
-    data_current = data.query(expr)
-    show_filtered(data_current, windows)
-    
+    global current_spec, data_current, current_version
 
-def show_filtered(data: pd.core.frame.DataFrame, 
-                  windows: dict) -> None:
-    """Display results of filtering a dataset."""
-    windows["data"].configure(state='normal')
-    windows["data"].delete('1.0', tk.END)
-    windows["data"].insert('1.0', data)
-    windows["data"].tag_add('redtext', '1.0', '1.end')
-    windows["data"].configure(state='disabled')
-
-    stats_agg = data.agg(stats_dict)
-    windows["stats"].configure(state='normal')
-    windows["stats"].delete('1.0', tk.END)
-    with pd.option_context('display.float_format', '{:0.2f}'.format):
-        windows["stats"].insert('1.0', stats_agg)
-
-    style_df_text(windows["stats"], stat_list)
-
-    nvalue = 'n = ' + str(data.count().iloc[0])
+    current_spec = spec
+    data_current = data
+    current_version = version
+
+    windows["data"].set_frame(data, header_tag='redtext', dataset=data_1)
+
+    if group == stats_group:
+        show_stats(stats_agg, windows)
+    else:
+        refresh_stats(data, spec, version, windows)
+
+    nvalue = 'n = ' + str(n)
     stat_n_lab.configure(text=nvalue)
 
     data_filter_btn.configure(style='MyButton2.TButton')
@@ -349,81 +549,145 @@ def show_filtered(data: pd.core.frame.DataFrame,
     if data.empty:
         set_status('No data found.')
 
+    view_publisher.publish(data, spec, version)
+
 
 def data_unfilter(data: pd.core.frame.DataFrame, 
                   windows: dict) -> None:
-    """Display the complete dataset."""
-    windows["data"].configure(state='normal')
-    windows["data"].delete('1.0', tk.END)
-    windows["data"].insert('1.0', data)
-    windows["data"].tag_add('bluetext', '1.0', '1.end')
-    windows["data"].configure(state='disabled')
-
-    stats_agg = data_current.agg(stats_dict)
-    windows["stats"].configure(state='normal')
-    windows["stats"].delete('1.0', tk.END)
-    with pd.option_context('display.float_format', '{:0.2f}'.format):
-        windows["stats"].insert('1.0', stats_agg)
-
-    style_df_text(windows["stats"], stat_list)
-
-    nvalue = 'n = ' + str(data_current.count().iloc[0])
+    """Display the complete dataset.
+
+    Statistics are computed on a worker thread; show_unfiltered() displays
+    the result.
+    """
+    version = data_version
+    group = stats_group
+
+    def work():
+        last_filter.reset()
+        return data_stats(data, (), version, group), de.count_rows(data)
+
+    runner.submit('view', work,
+                  callback=lambda result: show_unfiltered(data, *result, windows,
+                                                          group, version))
+
+
+@ins.traced('render')
+def show_unfiltered(data: pd.core.frame.DataFrame, 
+                    stats_agg: pd.core.frame.DataFrame,
+                    n: int,
+                    windows: dict,
+                    group: str | None,
+                    version: int) -> None:
+    """Display the complete dataset and its statistics; publish the view.
+
+    As in show_filtered(), statistics for an old group are computed again.
+    """
+    global current_spec, data_current, current_version
+
+    current_spec = ()
+    data_current = data
+    current_version = version
+
+    windows["data"].set_frame(data, header_tag='bluetext')
+
+    if group == stats_group:
+        show_stats(stats_agg, windows)
+    else:
+        refresh_stats(data, (), version, windows)
+
+    nvalue = 'n = ' + str(n)
     stat_n_lab.configure(text=nvalue)
 
     data_unfilter_btn.configure(style = 'MyButton3.TButton')
     data_filter_btn.configure(style = 'MyButton1.TButton')
 
-    if do_debug:
-        print(f'in function: {sys._getframe().f_code.co_name}')
-        print(f'...called by: {sys._getframe().f_back.f_code.co_name}')
-        print(f'locals are: {locals().keys()}')
-        func = data_unfilter
-        print(f'    co_varnames: {func.__code__.co_varnames}')
-        print(f'    co_argcount: {func.__code__.co_argcount}')
-        print(f'    co_nlocals: {func.__code__.co_nlocals}')
-        print()
+    view_publisher.publish(data, (), version)
+
+
+def decimation_title(plot_data: dict) -> str:
+    """Return a plot title describing decimation, or '' if none."""
+    match plot_data['method']:
+        case '':
+            return ''
+        case 'hexbin':
+            return f'density of {plot_data["n_total"]:,} points (hexbin)'
+        case method:
+            return (f'decimated: {len(plot_data["x"]):,} of '
+                    f'{plot_data["n_total"]:,} points ({method})')
 
 
 def line_plot(data: pd.DataFrame,
               xcol: tk.StringVar,
               ycol: tk.StringVar) -> None:
-    """Create line plot (the default) for input data."""
+    """Create line plot (the default) for input data.
+
+    The x and y columns are sorted by x, and decimated to at most
+    line_point_budget points, on a worker thread, then plotted. The plot
+    is redrawn for each new data view, until another plot replaces it.
+    """
     xdata = xcol.get()
     ydata = ycol.get()
-    sorted = data.sort_values(by=xdata)
 
-    # ? or use data.plot.line for explicitness
-    sorted.plot(x=xdata, y=ydata)
-    plt.show()
+    @ins.traced('plot prep')
+    def prepare(data):
+        xs, ys = pdata.sorted_xy(data, xdata, ydata, plot_buffers['line'])
+        return pdata.decimate_line(xs, ys, line_point_budget, line_decimation)
+
+    @ins.traced('plot draw')
+    def draw(plot_data):
+        get_plot_canvas().show_line(plot_data['x'], plot_data['y'],
+                                    xdata, ydata,
+                                    decimation_title(plot_data))
 
-    if do_debug:
-        print(f'in function: {sys._getframe().f_code.co_name}')
-        print(f'...called by: {sys._getframe().f_back.f_code.co_name}')
-        print('line_plot params:')
-        print(f'   xcol: {xcol} = {xdata}')
-        print(f'   ycol: {ycol} = {ydata}')
-        print()
+    runner.submit('line_plot', prepare, data, callback=draw)
+    view_publisher.subscribe(
+        'plot',
+        lambda view, spec, version: runner.submit('line_plot', prepare, view,
+                                                  callback=draw))
 
 
 def bar_plot(data: pd.DataFrame,
              xcol: tk.StringVar,
-             ycol: tk.StringVar) -> None:
-    """Create bar plot for input data."""
-
+             ycol: tk.StringVar,
+             aggvar: tk.StringVar,
+             spec: tuple = ()) -> None:
+    """Create bar plot for input data.
+
+    With an aggregation (mean, count, median, sum), there is one bar per
+    x group, or per x bin for numeric x with many values. Results are
+    cached by dataset version, filter spec, x, y and aggregation. With
+    'none', there is one bar per row, sorted by x. The plot is redrawn for
+    each new data view, until another plot replaces it.
+    """
     xdata = xcol.get()
     ydata = ycol.get()
-    dfsort = data.sort_values(by=xdata)
-
-    dfsort.plot.bar(x=xdata, y=ydata)
-    plt.show()
-
-    if do_debug:
-        print(f'in function: {sys._getframe().f_code.co_name}')
-        print(f'...called by: {sys._getframe().f_back.f_code.co_name}')
-        print('bar_plot params:')
-        print(f'   xcol: {xcol} = {xdata}')
-        print(f'   ycol: {ycol} = {ydata}')
-        print()
+    agg = aggvar.get()
+
+    @ins.traced('plot prep')
+    def prepare(data, spec, version):
+        if agg == 'none':
+            xs, ys = pdata.sorted_xy(data, xdata, ydata, plot_buffers['bar'])
+            # drawn on the Tk thread; the buffers are refilled by the next plot
+            return [str(v) for v in xs], ys.copy()
+
+        key = (version, fe.canonical_spec(spec), xdata, ydata, agg)
+        return bar_cache.lookup(
+            key, lambda: pdata.aggregate_bar(data, xdata, ydata, agg))
+
+    @ins.traced('plot draw')
+    def draw(bars):
+        label = ydata if agg == 'none' else f'{agg} of {ydata}'
+        get_plot_canvas().show_bars(bars[0], bars[1], xdata, label)
+
+    # cached under the version of the plotted view: while loading, the
+    # view may be from an older (partial) dataset than data_version
+    runner.submit('bar_plot', prepare, data, spec, current_version,
+                  callback=draw)
+    view_publisher.subscribe(
+        'plot',
+        lambda view, spec, version: runner.submit('bar_plot', prepare,
+                                                  view, spec, version,
+                                                  callback=draw))
 
 
 def scatter_plot(data: pd.DataFrame, 
@@ -432,11 +696,12 @@ def scatter_plot(data: pd.DataFrame,
                  y_variable: tk.StringVar) -> None:
     """Create scatter plot for input data.
     
-    Makes a copy of the DataFrame object passed in, to avoid mutating it.
+    Only the x, y and category columns are read; the DataFrame is not
+    copied or changed. The plot data is prepared on a worker thread, then
+    plotted, colored by category code. Plots with more than
+    scatter_point_budget points are drawn from a random sample. The plot
+    is redrawn for each new data view, until another plot replaces it.
     """
-    data_copy = pd.DataFrame(data)
-    plot_data = None
-
     source = {'x': x_variable.get(),
               'y': y_variable.get()}
 
@@ -448,28 +713,226 @@ def scatter_plot(data: pd.DataFrame,
     if catlist in [['auto'], ['']]:
         catlist = []
 
-    def create_plot(data, cat):
-        data.plot.scatter(x=source['x'],
-                          y=source['y'], 
-                          c=cat, 
-                          cmap='viridis',
-                          s=40)
+    def create_plot(plot_data, cat_names):
+        title = decimation_title(plot_data)
+        if plot_data['method'] == 'hexbin':
+            get_plot_canvas().show_hexbin(plot_data['x'], plot_data['y'],
+                                          source['x'], source['y'], title)
+        else:
+            get_plot_canvas().show_scatter(plot_data['x'], plot_data['y'],
+                                           plot_data['c'], cat_names,
+                                           source['x'], source['y'],
+                                           category, title)
 
     if category:
         if ((not catlist) or catlist == None or (not isinstance(catlist, list))):
-            print('\nWARNING: no category list; finding category values...\n')
-            data_copy[category] = data_copy[category].astype('category')
-            plot_data = data_copy
-        else:
-            # print('if category else...')
-            data_copy[category] = pd.Categorical(data_copy[category], categories=catlist, ordered=False)    
-            plot_data = data_copy[data_copy[category].isin(catlist)]
+            set_status('No category list; using the categories in the data.')
+            catlist = []
     else:
-        plot_data = data_copy
         category = None
 
-    create_plot(plot_data, category)
-    plt.show()
+    @ins.traced('plot prep')
+    def prepare(data):
+        xs, ys, codes, cat_names = pdata.scatter_xyc(data,
+                                                     source['x'], source['y'],
+                                                     category, catlist,
+                                                     plot_buffers['scatter'])
+        hexbin_min = hexbin_min_points if use_hexbin else None
+        plot_data = pdata.decimate_scatter(xs, ys, codes,
+                                           scatter_point_budget, hexbin_min)
+        return plot_data, cat_names
+
+    @ins.traced('plot draw')
+    def draw(prepared):
+        create_plot(*prepared)
+
+    runner.submit('scatter_plot', prepare, data, callback=draw)
+    view_publisher.subscribe(
+        'plot',
+        lambda view, spec, version: runner.submit('scatter_plot', prepare, view,
+                                                  callback=draw))
+
+
+"""
+------------------------
+deferred UI construction
+------------------------
+"""
+def get_plot_canvas() -> object:
+    """Return the plot figure; the first call imports matplotlib and builds it."""
+    global plot_canvas
+
+    if plot_canvas is None:
+        import plot_canvas as pc
+
+        # one figure, reused by every plot
+        plot_canvas = pc.PlotCanvas(plot_label_fr)
+        plot_canvas.widget.pack(side='left', padx=5, pady=5, fill='both',
+                                expand=True)
+
+    return plot_canvas
+
+
+def build_plot_ui() -> None:
+    """Build the line and bar plot controls, the first time they are shown.
+
+    The scatter plot controls are built by build_scatter_ui(), when opened.
+    """
+    global plotting_main, scatter_open_btn
+    global line_data_x, line_data_y, bar_data_x, bar_data_y, bar_agg
+
+    if plotting_main is not None:
+        return
+
+    plot_open_btn.destroy()
+    plotting_main = ttk.Frame(plot_label_fr)
+
+    # ---------- Line plot
+    line_data_x = tk.StringVar()
+    line_data_y = tk.StringVar()
+
+    btn_line_plot = ttk.Button(plotting_main,
+                    text='Line',
+                    command=lambda x=line_data_x, y=line_data_y: line_plot(data_current, x, y))
+
+    line_x_fr = custui.FramedCombo(plotting_main,
+                                   cb_values=data_columns,
+                                   display_name=x_text,
+                                   name='line_x',
+                                   var=line_data_x,
+                                   posn=[0,1])
+
+    line_y_fr = custui.FramedCombo(plotting_main,
+                                   cb_values=data_columns[2:],
+                                   display_name=y_text,
+                                   name='line_y',
+                                   var=line_data_y,
+                                   posn=[0,2])
+
+    # ---------- Bar plot
+    bar_data_x = tk.StringVar()
+    bar_data_y = tk.StringVar()
+    bar_agg = tk.StringVar()
+
+    btn_bar_plot = ttk.Button(plotting_main,
+                   text='Bar',
+                   command=lambda x=bar_data_x, y=bar_data_y, a=bar_agg: bar_plot(data_current, x, y, a, current_spec))
+
+    bar_x_fr = custui.FramedCombo(plotting_main,
+                                  cb_values=data_columns[1:],
+                                  display_name=x_text,
+                                  name='bar_x',
+                                  var=bar_data_x,
+                                  posn=[1,1])
+
+    bar_y_fr = custui.FramedCombo(plotting_main,
+                                  cb_values=data_columns[2:],
+                                  display_name=y_text,
+                                  name='bar_y',
+                                  var=bar_data_y,
+                                  posn=[1,2])
+
+    # 'none': one bar per row
+    bar_agg_fr = custui.FramedCombo(plotting_main,
+                                    cb_values=pdata.BAR_AGGS + ['none'],
+                                    display_name='by',
+                                    name='bar_agg',
+                                    var=bar_agg,
+                                    posn=[1,3])
+
+    # ---------- Scatter plot
+    scatter_open_btn = ttk.Button(plotting_main,
+                                  text='Scatter...',
+                                  command=build_scatter_ui)
+
+    y_spacing = 5
+    btn_line_plot.grid(row=0, column=0, padx=5, pady=y_spacing, sticky=tk.W)
+    btn_bar_plot.grid(row=1, column=0, padx=5, pady=y_spacing, sticky=tk.W)
+    scatter_open_btn.grid(row=2, column=0, padx=5, pady=y_spacing, sticky=tk.W)
+
+    plotting_main.pack(side='left', padx=5, pady=5, fill='both')
+
+
+def build_scatter_ui() -> None:
+    """Build the scatter plot controls, in place of the 'Scatter...' button."""
+    global scatter_setup_fr, category_values_ent, use_category, category_lb
+    global scatter_x, scatter_y, cat_var
+
+    scatter_open_btn.destroy()
+
+    scatter_x = tk.StringVar()
+    scatter_y = tk.StringVar()
+
+    scatter_setup_fr = ttk.Frame(plotting_main, border=2, relief='groove')
+
+    category_values = 'auto'
+    category_values_ent = custui.MyEntry(scatter_setup_fr, 
+                                         name='categories',
+                                         text=category_values)
+
+    scatter_select_fr = ttk.Frame(scatter_setup_fr)
+
+    scatter_plot_btn = ttk.Button(scatter_select_fr,
+                       text='Scatter',
+                       width=6,
+                       command=lambda ent=category_values_ent, x=scatter_x, y=scatter_y: scatter_plot(data_current, ent, x, y)
+
+                       )
+
+    scatter_x_fr = custui.FramedCombo(scatter_select_fr,
+                                   cb_values=data_columns[1:],
+                                   display_name=x_text,
+                                   name='scatter_x',
+                                   var=scatter_x,
+                                   posn=[0,1])
+
+    scatter_y_fr = custui.FramedCombo(scatter_select_fr,
+                                   cb_values=data_columns[2:],
+                                   display_name=y_text,
+                                   name='scatter_y',
+                                   var=scatter_y,
+                                   posn=[0,2])
+
+    use_category = tk.IntVar(master=scatter_setup_fr, value = 0, name='use_category')
+    use_category_chkb = ttk.Checkbutton(scatter_setup_fr,
+                                       text='Use category:',
+                                       width=15,
+                                       offvalue=0,
+                                       variable=use_category,
+                                       command=lambda n='use_category': set_use_category(n)
+                                       )
+                                    #  style='MyCheckbutton.TCheckbutton')
+
+    category_list = ['', 'gender']
+    cat_var = tk.Variable(value=category_list)
+
+    category_lb= tk.Listbox(scatter_setup_fr,
+                            exportselection=False,
+                            height=2,
+                            width=10,
+                            listvariable=cat_var
+                            )
+
+    category_lb.select_set(0)
+
+    # alternate way to load values to the Listbox category_lb. This may be the
+    # only way to number the list items.
+    # for ind, val in enumerate(category_list):
+    #     category_lb.insert(ind, val)
+
+    label_cat_list = tk.Label(scatter_setup_fr, text='with category values:')
+
+    scatter_select_fr.grid(row=0, column=0, columnspan=3, pady=10)
+
+    use_category_chkb.grid(row=1, column=0,   padx=20,         sticky='w')
+    category_lb.grid(row=2, column=0,         padx=20, pady=10, sticky='w')
+    label_cat_list.grid(row=1, column=1,      padx=0,         sticky='w')
+    category_values_ent.grid(row=2, column=1, padx=0, pady=10, sticky='w')
+
+    scatter_plot_btn.grid(row=0, column=0, padx=5, sticky=tk.W)
+
+    scatter_setup_fr.grid(row=2, column=0, columnspan=3, padx=5, pady=5,
+                          ipadx=5, ipady=5)
 
 
 # ===== END Functions =====
@@ -488,6 +951,17 @@ styles_ttk.CreateStyles()
 # flags
 use_pandas = True
 
+# plotting: larger plots are decimated to about this many points
+line_point_budget = 4000
+scatter_point_budget = 20000
+line_decimation = 'lttb'          # or 'minmax' (min and max per bucket)
+use_hexbin = False                # scatter plots without a category...
+hexbin_min_points = 500_000       # ...and this many points: draw a hexbin
+plot_update_ms = 250              # wait for filter changes to settle
+
+# memory for cached filter results (row positions)
+filter_cache_mb = 64
+
 category_values_ent = None
 
 data_columns = ["gender", "age", "TID", "stress EF", "rest EF"]
@@ -503,17 +977,76 @@ y_text = 'y'
 
 data_current = None
 
+# filter spec for the displayed data; empty when showing all data
+current_spec = ()
+
+# incremented when the dataset is (re)loaded; part of the stats cache key
+data_version = 0
+
+# data_version of the displayed data
+current_version = 0
+
+# column whose values group the statistics; None for one table of all rows
+stats_group = None
+
+# reused arrays for each kind of plot
+plot_buffers = {'line': pdata.PlotBuffers(),
+                'bar': pdata.PlotBuffers(),
+                'scatter': pdata.PlotBuffers()}
+
+# bar plot heights, by dataset version, filter, x, y and aggregation
+bar_cache = se.StatsCache(maxsize=32, name='bar cache')
+
+# background work: filtering, statistics, plot preparation
+runner = wk.TaskRunner(root, on_state=set_busy, on_error=show_task_error,
+                       profiler=profiler)
+
+# tells the current plot about a new data view (filter result)
+view_publisher = wk.ViewPublisher(root, delay_ms=plot_update_ms)
+
+# statistics tables for recent filters, and for all data
+stats_cache = se.StatsCache(maxsize=32)
+
+# matching rows of recent filters, by dataset version and canonical spec;
+# entries for an older dataset version are never looked up, and are evicted
+filter_cache = se.StatsCache(maxsize=64,
+                             name='filter cache',
+                             max_bytes=filter_cache_mb * 2**20)
+
+# result of the last filter, to refine when filter terms are added
+last_filter = fe.IncrementalFilter()
+
 # Read the dataset
 # ================
 # subset of 21 records
-data_0 = pd.read_csv('data/strain_nml_sample.csv')
+data_path = 'data/strain_nml_sample.csv'
 
 # entire 91 records, slightly different columns
-# data_1 = pd.read_csv('data/strain_nml.csv')
+# data_path = 'data/strain_nml.csv'
+
+# or several files, e.g. one per site: read in parallel and combined
+# data_path = 'data/strain_*.csv'
+
+# for a dataset larger than memory: keep it on disk in chunks, built on
+# the first run (see chunk_store). Only the displayed or plotted rows are
+# read into memory. data_path must be one csv file.
+out_of_core = False
+
+if out_of_core:
+    store = cs.open_store(data_path, prepare=de.clean_column_names)
+    loader = None
+    data_1 = cs.StoreView(store)
+else:
+    # read in the background; display the first chunk while the rest loads
+    loader = dl.open_dataset(data_path, prepare=de.clean_column_names)
+    loader.start()
+    data_1 = loader.first_chunk()
 
-data_1 = clean_column_names(data_0)
 data_columns = list(data_1.columns)
 
+# chunks collected by poll_loader(), not yet appended to data_1
+loaded_chunks = []
+
 # to update the display after filtering
 data_current = data_1
 
@@ -527,27 +1060,25 @@ data_label = ttk.Label(data_ui, text='data:',
                        style='BoldLabel.TLabel')
 data_label.pack(anchor='w')
 
-data_win = tk.Text(data_ui, width=50, height=15,
-                   background='beige',
-                   foreground='black',
-                   borderwidth=2,
-                   relief='sunken',
-                   name='datawin')
+# only the visible rows are formatted; the scrollbar moves by data row
+data_win = custui.DataFrameText(data_ui, width=50, height=15,
+                                background='beige',
+                                foreground='black',
+                                borderwidth=2,
+                                relief='sunken',
+                                name='datawin')
 windows["data"] = data_win
 
 data_win.tag_configure("bluetext", foreground='blue')
 data_win.tag_configure("redtext", foreground='red')
-data_win.tag_add('bluetext', '1.0', '1.end')
-
-data_win.insert('1.0', data_current)
-data_win.configure(state='disabled')
 
 data_win.pack(side='left', pady=5, fill='x', expand=True)
 
-data_scroll = ttk.Scrollbar(data_ui, orient='vertical', command=data_win.yview)
+data_scroll = ttk.Scrollbar(data_ui, orient='vertical')
 data_scroll.pack(side='right', fill='y', pady=5)
 
-data_win['yscrollcommand'] = data_scroll.set
+data_win.set_scrollbar(data_scroll)
+data_win.set_frame(data_current, header_tag='bluetext')
 
 
 # Statistics UI
@@ -563,7 +1094,24 @@ stat_lab.pack(anchor='w')
 stat_n_lab = ttk.Label(stat_ui, text='n')
 stat_n_lab.pack(anchor='w', padx=10)
 
-stat_win = tk.Text(stat_ui, width=50, height=10,
+# statistics of each value of a category column; not in out-of-core mode
+stat_group_fr = ttk.Frame(stat_ui)
+stat_group_lab = ttk.Label(stat_group_fr, text='group by: ')
+stats_group_var = tk.StringVar(value='none')
+stats_group_cb = ttk.Combobox(stat_group_fr,
+                              width=12,
+                              exportselection=False,
+                              state='disabled' if out_of_core else 'readonly',
+                              textvariable=stats_group_var,
+                              name='stats_group')
+stats_group_cb.bind('<<ComboboxSelected>>', set_stats_group)
+update_group_choices(data_1)
+
+stat_group_lab.pack(side='left')
+stats_group_cb.pack(side='left')
+stat_group_fr.pack(anchor='w', padx=10)
+
+stat_win = custui.LineText(stat_ui, width=50, height=10,
                      background='beige',
                      foreground='black',
                      font=('Courier New', 14),
@@ -577,16 +1125,22 @@ stat_scroll.pack(side='right', fill='y', pady=5)
 stat_win['yscrollcommand'] = stat_scroll.set
 
 # for a good summary of skew and kurtosis, see medium.com
-stat_list = ['mean', 'std', 'min', 'median', 'max', 'skew', 'kurtosis']
+stat_list = de.STAT_LIST
+
+# format of the values in the statistics window
+stats_float_format = '{:0.2f}'
+
+stats_dict = de.stats_columns(data_1, stat_list)
 
-stats_dict = {}
-for c in data_1.columns:
-    if data_1[c].dtype == 'int64' or data_1[c].dtype == 'float64':
-        # numeric_cols.append(c)
-        stats_dict[c] = stat_list
+# statistics updated as chunks are loaded
+running_stats = se.RunningStats(list(stats_dict))
+if loader is not None:
+    running_stats.update(data_1)
 
 # stats_agg = data_1.agg(stats_dict)
-stats_agg = data_current.agg(stats_dict)
+# computed on a worker thread: for an out-of-core store, this reads the
+# whole store from disk
+refresh_stats(data_current, (), current_version, windows)
 
 # get the number of data rows that have a 'pt code' (i.e. are valid records):
 # method 1: the chosen method, the most succinct way I can find that uses
@@ -606,13 +1160,12 @@ stats_agg = data_current.agg(stats_dict)
 # method 4: simple, does not use a pandas function
 # print(f'items in data_current: {len(data_current)}')
 
-nvalue = 'n = ' + str(data_current.count().iloc[0])
+nvalue = 'n = ' + str(de.count_rows(data_current))
 stat_n_lab.configure(text=nvalue)
 
 # Format floating point values
-# method 1: format for display but don't change the DataFrame
-with pd.option_context('display.float_format', '{:0.2f}'.format):
-    stat_win.insert('1.0', stats_agg)
+# method 1: format for display but don't change the DataFrame (see
+# show_stats())
 
 # method 2: create a new DataFrame with formatted values.
 # Preserves stats for the whole dataset, for possible later conparison to
@@ -650,9 +1203,8 @@ filter_lab.pack(anchor='w')
 data_filter_btn = ttk.Button(filter_fr,
                         text='criteria:',
                         style='MyButton1.TButton',
-                        command=lambda d=data_1, 
-                                       w=windows, 
-                                       f=item_rows: data_filter(d, w, f))
+                        command=lambda w=windows, 
+                                       f=item_rows: data_filter(data_1, w, f))
 
 data_filter_btn.pack(side='left', padx=5, pady=10)
 
@@ -684,8 +1236,7 @@ rowframe.grid(row=0, column=0, sticky='nw')
 data_unfilter_btn = ttk.Button(filter_ui,
                         text='show all data',
                         style='MyButton3.TButton',
-                        command=lambda d=data_1, 
-                                       w=windows: data_unfilter(d, w))
+                        command=lambda w=windows: data_unfilter(data_1, w))
 data_unfilter_btn.pack(side='bottom', pady=5)
 
 filter_fr.pack(padx=10, pady=10, fill='both')
@@ -693,147 +1244,26 @@ filter_fr.pack(padx=10, pady=10, fill='both')
 
 # plotting UI
 # ===========
+# the plot controls, the scatter plot controls, and the figure are built
+# when first used; see build_plot_ui(), build_scatter_ui(), get_plot_canvas()
 plot_label_fr = ttk.Frame(root, border=2, relief='raised')
 plotting_label = ttk.Label(plot_label_fr, text='plotting:',
                            style='BoldLabel.TLabel')
-plotting_main = ttk.Frame(plot_label_fr)
 plotting_label.pack(anchor='w')
 
-# ---------- Line plot
-line_data_x = tk.StringVar()
-line_data_y = tk.StringVar()
-
-btn_line_plot = ttk.Button(plotting_main,
-                text='Line',
-                command=lambda df=data_1, x=line_data_x, y=line_data_y: line_plot(df, x, y))
-
-line_x_fr = custui.FramedCombo(plotting_main,
-                               cb_values=data_columns,
-                               display_name=x_text,
-                               name='line_x',
-                               var=line_data_x,
-                               posn=[0,1])
-
-# print(f'line_x_fr doc: {line_x_fr.__doc__}')
-# print()
-# print(f'props:{line_x_fr.props()}')
-
-line_y_fr = custui.FramedCombo(plotting_main,
-                               cb_values=data_columns[2:],
-                               display_name=y_text,
-                               name='line_y',
-                               var=line_data_y,
-                               posn=[0,2])
-
-# ---------- Bar plot
-# bar_data = tk.StringVar(value=data_columns[2])
-bar_data_x = tk.StringVar()
-bar_data_y = tk.StringVar()
-
-btn_bar_plot = ttk.Button(plotting_main,
-               text='Bar',
-               command=lambda df=data_1, x=bar_data_x, y=bar_data_y: bar_plot(df, x, y))
-
-bar_x_fr = custui.FramedCombo(plotting_main,
-                              cb_values=data_columns[1:],
-                              display_name=x_text,
-                              name='bar_x',
-                              var=bar_data_x,
-                              posn=[1,1])
-
-bar_y_fr = custui.FramedCombo(plotting_main,
-                              cb_values=data_columns[2:],
-                              display_name=y_text,
-                              name='bar_y',
-                              var=bar_data_y,
-                              posn=[1,2])
-
-# ---------- Scatter plot
-scatter_x = tk.StringVar()
-scatter_y = tk.StringVar()
-
-scatter_setup_fr = ttk.Frame(plotting_main, border=2, relief='groove')
-
-category_values = 'auto'
-category_values_ent = custui.MyEntry(scatter_setup_fr, 
-                                     name='categories',
-                                     text=category_values)
-
-scatter_select_fr = ttk.Frame(scatter_setup_fr)
-
-scatter_plot_btn = ttk.Button(scatter_select_fr,
-                   text='Scatter',
-                   width=6,
-                   command=lambda df=data_1, ent=category_values_ent, x=scatter_x, y=scatter_y: scatter_plot(df, ent, x, y)
-
-                   )
-
-scatter_x_fr = custui.FramedCombo(scatter_select_fr,
-                               cb_values=data_columns[1:],
-                               display_name=x_text,
-                               name='scatter_x',
-                               var=scatter_x,
-                               posn=[0,1])
-
-scatter_y_fr = custui.FramedCombo(scatter_select_fr,
-                               cb_values=data_columns[2:],
-                               display_name=y_text,
-                               name='scatter_y',
-                               var=scatter_y,
-                               posn=[0,2])
-
-use_category = tk.IntVar(master=scatter_setup_fr, value = 0, name='use_category')
-use_category_chkb = ttk.Checkbutton(scatter_setup_fr,
-                                   text='Use category:',
-                                   width=15,
-                                   offvalue=0,
-                                   variable=use_category,
-                                   command=lambda n='use_category': set_use_category(n)
-                                   )
-                                #  style='MyCheckbutton.TCheckbutton')
-use_category_chkb.bind('<Button-1>', chkb_extra)
-
-category_list = ['', 'gender']
-cat_var = tk.Variable(value=category_list)
-
-category_lb= tk.Listbox(scatter_setup_fr,
-                        exportselection=False,
-                        height=2,
-                        width=10,
-                        listvariable=cat_var
-                        )
-
-category_lb.select_set(0)
-
-# alternate way to load values to the Listbox category_lb. This may be the
-# only way to number the list items.
-# for ind, val in enumerate(category_list):
-#     category_lb.insert(ind, val)
-
-label_cat_list = tk.Label(scatter_setup_fr, text='with category values:')
-
-scatter_select_fr.grid(row=0, column=0, columnspan=3, pady=10)
-
-use_category_chkb.grid(row=1, column=0,   padx=20,         sticky='w')
-category_lb.grid(row=2, column=0,         padx=20, pady=10, sticky='w')
-label_cat_list.grid(row=1, column=1,      padx=0,         sticky='w')
-category_values_ent.grid(row=2, column=1, padx=0, pady=10, sticky='w')
-
-
-# test object placement on the UI
-# test_ent = custui.MyEntry(scatter_setup_fr, 
-#                           name='test_ent',                                    #  text=cat_val_var)
-#                           text='arbitrary')
+plotting_main = None
+plot_canvas = None
+scatter_open_btn = None
 
-# test
-# print(f'MyEntry name attr = {category_values_ent.name}')
-
-# test_ent.grid(row=3, column=1, padx=5, pady=5, sticky='w')
+plot_open_btn = ttk.Button(plot_label_fr,
+                           text='show plot controls',
+                           command=build_plot_ui)
+plot_open_btn.pack(anchor='w', padx=5, pady=5)
 
 
 # global UI
 # =========
-btnq = ttk.Button(root, text='Quit', command=root.destroy)
+btnq = ttk.Button(root, text='Quit', command=quit_app)
 btnq.configure(style='MyButton1.TButton')
 
 
@@ -841,17 +1271,6 @@ btnq.configure(style='MyButton1.TButton')
 # -----------
 y_spacing = 5
 
-# plotting
-btn_line_plot.grid(row=0, column=0, padx=5, pady=y_spacing, sticky=tk.W)
-btn_bar_plot.grid(row=1, column=0, padx=5, pady=y_spacing, sticky=tk.W)
-
-scatter_setup_fr.grid(row=2, column=0, columnspan=3, padx=5, pady=y_spacing,
-                      ipadx=5, ipady=5)
-
-scatter_plot_btn.grid(row=0, column=0, padx=5, sticky=tk.W)
-
-plotting_main.pack(padx=5, pady=5, fill='both')
-
 # status bar
 # ----------
 status_fr = ttk.Frame(root, relief='groove')
@@ -860,8 +1279,21 @@ status_lab = ttk.Label(status_fr, text='status: ')
 status_txt = tk.StringVar()
 status_bar = ttk.Label(status_fr, textvariable=status_txt)
 
+busy_txt = tk.StringVar(value='idle')
+busy_lab = ttk.Label(status_fr, textvariable=busy_txt, width=5)
+
+# stage timings and cache summaries; see instrument
+timing_panel = None
+timing_btn = ttk.Button(status_fr, text='timing...', command=show_timing_panel)
+
 status_lab.pack(side='left', padx=3, pady=3)
 status_bar.pack(side='left', padx=3, pady=3, expand=True, fill='both')
+busy_lab.pack(side='right', padx=3, pady=3)
+timing_btn.pack(side='right', padx=3, pady=3)
+
+# collect the rest of the dataset as it is read
+if loader is not None:
+    root.after(100, poll_loader, loader, windows)
 
 
 # main UI sections
@@ -874,20 +1306,5 @@ status_fr.grid(row=2, column=0, columnspan=2, padx=5, sticky='ew')
 
 btnq.grid(row=3, column=0, columnspan=2, padx=10, pady=10)
 
-# inspect functions in this module
-# =================
-if do_profile:
-    import inspect
-
-    all_module_fxn = [obj for name, obj in inspect.getmembers(sys.modules[__name__]) 
-                        if (inspect.isfunction(obj) and
-                            obj.__module__ == __name__)]
-    for f in all_module_fxn:
-        print(f.__name__)
-        # parameter names and type hints
-        sig = (inspect.signature(f))
-        print(f'   signature: {sig}')
-    print()
-
 if __name__ == "__main__":
     root.mainloop()
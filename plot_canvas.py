@@ -0,0 +1,243 @@
+"""
+module: plot_canvas.py
+
+purpose: provide one matplotlib Figure, embedded in the tkinter UI, that
+         is reused for every plot.
+
+comments: A new plot of the same kind, with the same axis labels, updates
+          the existing artists (set_data, set_offsets, set_height) and is
+          redrawn by blitting: the saved background is restored and only
+          the data artists are drawn. The whole figure is redrawn only if
+          the axes limits, title or layout change.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+"""
+
+import matplotlib
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
+class PlotCanvas:
+    """
+    PlotCanvas : a matplotlib Figure in a tkinter widget, reused for plots.
+
+    Attributes
+    ----------
+    figure : matplotlib.figure.Figure
+    canvas : FigureCanvasTkAgg
+    widget : tk.Canvas
+        the tkinter widget, for pack or grid
+    ax : matplotlib.axes.Axes
+    layout : tuple
+        what the axes were built for: plot kind, axis labels, categories
+    artists : list
+        data artists, redrawn when blitting
+
+    Methods
+    -------
+    show_line:
+        Draws, or updates, a line plot.
+    show_bars:
+        Draws, or updates, a bar plot.
+    show_scatter:
+        Draws, or updates, a scatter plot.
+    show_hexbin:
+        Draws a hexbin density plot.
+    """
+    def __init__(self, parent,
+                       figsize=(5, 4),
+                       dpi=80
+                ):
+        """
+        Inits a PlotCanvas object.
+
+        Parameters
+        ----------
+        parent : tk widget
+            container for the canvas widget
+        figsize : tuple
+            width and height, in inches
+        dpi : int
+            dots per inch
+        """
+        self.figure = Figure(figsize=figsize, dpi=dpi, layout='constrained')
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.widget = self.canvas.get_tk_widget()
+
+        self.ax = self.figure.add_subplot()
+        self.layout = None
+        self.artists = []
+        self.background = None
+
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event) -> None:
+        """After a full draw, save the background and draw the data."""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def redraw(self, full: bool) -> None:
+        """Redraw the whole figure, or blit only the data artists."""
+        if full or self.background is None:
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self.background)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
+    def rebuild(self, layout: tuple) -> None:
+        """Clear the figure, for a new kind of plot or new axis labels."""
+        self.figure.clear()
+        self.ax = self.figure.add_subplot()
+        self.layout = layout
+        self.artists = []
+        self.background = None
+
+    def set_title(self, title: str) -> bool:
+        """Set the axes title; True if it changed."""
+        if self.ax.get_title() == title:
+            return False
+
+        self.ax.set_title(title, fontsize=9)
+        return True
+
+    def set_limits(self, xs: np.ndarray | None, ys: np.ndarray) -> bool:
+        """Fit the axes limits to the data; True if they changed.
+
+        The limits are kept if the data fits inside them and fills at
+        least half of each axis, so small changes can be blitted. An axis
+        with values None is not changed.
+        """
+        changed = False
+        for values, get_lim, set_lim in [(xs, self.ax.get_xlim, self.ax.set_xlim),
+                                         (ys, self.ax.get_ylim, self.ax.set_ylim)]:
+            if values is None or len(values) == 0 or values.dtype.kind not in 'iuf':
+                continue
+            lo, hi = np.nanmin(values), np.nanmax(values)
+            if not np.isfinite(lo) or not np.isfinite(hi):
+                continue
+
+            cur_lo, cur_hi = get_lim()
+            span = cur_hi - cur_lo
+            if cur_lo <= lo and hi <= cur_hi and (hi - lo) >= span / 2:
+                continue
+
+            margin = 0.05 * (hi - lo) if hi > lo else 0.5
+            set_lim(lo - margin, hi + margin)
+            changed = True
+
+        return changed
+
+    def show_line(self, xs: np.ndarray,
+                        ys: np.ndarray,
+                        xlabel: str,
+                        ylabel: str,
+                        title: str = '') -> None:
+        """Draw a line plot, or update the current one."""
+        layout = ('line', xlabel, ylabel)
+
+        # text x values set a category axis; those are always rebuilt
+        if self.layout == layout and xs.dtype.kind in 'iuf':
+            self.artists[0].set_data(xs, ys)
+            full = self.set_limits(xs, ys)
+        else:
+            self.rebuild(layout)
+            line, = self.ax.plot(xs, ys, label=ylabel, animated=True)
+            self.artists = [line]
+            self.ax.set_xlabel(xlabel)
+            self.ax.legend()
+            full = True
+
+        full = self.set_title(title) or full
+        self.redraw(full)
+
+    def show_bars(self, labels: list,
+                        heights: np.ndarray,
+                        xlabel: str,
+                        ylabel: str) -> None:
+        """Draw a bar plot, or update the bar heights of the current one."""
+        layout = ('bar', xlabel, ylabel, tuple(labels))
+        posns = np.arange(len(labels))
+
+        if self.layout == layout:
+            for bar, height in zip(self.artists, heights):
+                bar.set_height(height)
+            full = self.set_limits(None,
+                                   np.append(np.asarray(heights, dtype=float), 0.0))
+        else:
+            self.rebuild(layout)
+            bars = self.ax.bar(posns, heights, width=0.5, label=ylabel,
+                               animated=True)
+            self.artists = list(bars)
+            self.ax.set_xticks(posns, labels=labels, rotation=90)
+            self.ax.set_xlabel(xlabel)
+            self.ax.legend()
+            full = True
+
+        self.redraw(full)
+
+    def show_scatter(self, xs: np.ndarray,
+                           ys: np.ndarray,
+                           codes: np.ndarray | None,
+                           cat_names: list | None,
+                           xlabel: str,
+                           ylabel: str,
+                           category: str | None,
+                           title: str = '') -> None:
+        """Draw a scatter plot, colored by category code, or update it."""
+        layout = ('scatter', xlabel, ylabel, category,
+                  None if cat_names is None else tuple(cat_names))
+
+        if self.layout == layout:
+            points = self.artists[0]
+            points.set_offsets(np.column_stack([xs, ys]))
+            if codes is not None:
+                points.set_array(codes)
+            full = self.set_limits(xs, ys)
+        else:
+            self.rebuild(layout)
+            if codes is None:
+                points = self.ax.scatter(xs, ys, s=40, animated=True)
+            else:
+                # one color per category, labeled on the colorbar
+                ncat = len(cat_names)
+                points = self.ax.scatter(xs, ys,
+                                         c=codes,
+                                         cmap=matplotlib.colormaps['viridis'].resampled(ncat),
+                                         vmin=-0.5,
+                                         vmax=ncat - 0.5,
+                                         s=40,
+                                         animated=True)
+                cbar = self.figure.colorbar(points, ax=self.ax, ticks=range(ncat))
+                cbar.ax.set_yticklabels(cat_names)
+                cbar.set_label(category)
+            self.artists = [points]
+            self.ax.set_xlabel(xlabel)
+            self.ax.set_ylabel(ylabel)
+            full = True
+
+        full = self.set_title(title) or full
+        self.redraw(full)
+
+    def show_hexbin(self, xs: np.ndarray,
+                          ys: np.ndarray,
+                          xlabel: str,
+                          ylabel: str,
+                          title: str = '') -> None:
+        """Draw a hexbin density plot; always a full redraw."""
+        self.rebuild(('hexbin', xlabel, ylabel))
+        cells = self.ax.hexbin(xs, ys, gridsize=60, mincnt=1, cmap='viridis')
+        self.figure.colorbar(cells, ax=self.ax, label='count')
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.set_title(title)
+        self.redraw(True)
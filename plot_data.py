@@ -0,0 +1,341 @@
+"""
+module: plot_data.py
+
+purpose: prepare the arrays for line, bar and scatter plots without
+         copying the DataFrame.
+
+comments: Only the plotted columns are read, as NumPy arrays (views, for
+          numeric columns). Sorting uses an argsort index, and the sorted
+          values are written into buffers that are reused from plot to plot.
+
+          The buffers belong to the worker thread that prepares plots. The
+          arrays returned by decimate_line() and decimate_scatter(), which
+          are drawn on the Tk thread, never share memory with them, so a
+          newer plot can refill the buffers while an older one is drawn.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  Add decimation for large plots: LTTB or min/max bucketing for
+            line plots, random sampling (or hexbin) for scatter plots.
+10-18-2026  Add aggregate_bar(): one bar per x group (or x bin), with y
+            reduced by mean, count, median or sum.
+10-18-2026  decimate_line() and decimate_scatter() return copies of the
+            input arrays when they do not decimate, so plot data drawn on
+            the Tk thread is never a view of the reused buffers.
+"""
+
+import numpy as np
+import pandas as pd
+
+# ways to reduce y values in a bar plot group
+BAR_AGGS = ['mean', 'count', 'median', 'sum']
+
+
+class PlotBuffers:
+    """
+    PlotBuffers : reusable arrays for plot data.
+
+    A buffer grows when a larger plot needs it, and is otherwise reused,
+    so repeated plots do not allocate new arrays. Buffers are used by one
+    thread at a time (the TaskRunner worker), and are not drawn from.
+
+    Attributes
+    ----------
+    arrays : dict
+        name: the NumPy array kept for that name
+
+    Methods
+    -------
+    array:
+        Returns a buffer of a given length and dtype.
+    """
+    def __init__(self):
+        """Inits a PlotBuffers object, with no buffers."""
+        self.arrays = {}
+
+    def array(self, name: str, n: int, dtype) -> np.ndarray:
+        """Return a length-n view of the buffer called name."""
+        dtype = np.dtype(dtype)
+        buf = self.arrays.get(name)
+        if buf is None or buf.dtype != dtype or len(buf) < n:
+            # grow by at least half, so slowly growing data reallocates rarely
+            size = n if buf is None else max(n, len(buf) + len(buf) // 2)
+            buf = np.empty(size, dtype=dtype)
+            self.arrays[name] = buf
+
+        return buf[:n]
+
+
+def column_values(data: pd.DataFrame, column: str) -> np.ndarray:
+    """Return a column as a NumPy array; a view, for numeric columns."""
+    return data[column].to_numpy(copy=False)
+
+
+def sort_keys(data: pd.DataFrame, column: str) -> np.ndarray:
+    """Return the values to sort a column by, in the order of sort_values.
+
+    Categorical columns sort by category code, with missing values last.
+    """
+    col = data[column]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        codes = col.cat.codes.to_numpy()
+        return np.where(codes < 0, len(col.cat.categories), codes)
+
+    return col.to_numpy(copy=False)
+
+
+def sorted_xy(data: pd.DataFrame,
+              x: str,
+              y: str,
+              buffers: PlotBuffers) -> tuple:
+    """Return x and y values, sorted by x, in reusable buffers."""
+    order = np.argsort(sort_keys(data, x), kind='stable')
+    n = len(order)
+
+    x_values = column_values(data, x)
+    y_values = column_values(data, y)
+    xs = buffers.array('x', n, x_values.dtype)
+    ys = buffers.array('y', n, y_values.dtype)
+    np.take(x_values, order, out=xs)
+    np.take(y_values, order, out=ys)
+
+    return xs, ys
+
+
+def scatter_xyc(data: pd.DataFrame,
+                x: str,
+                y: str,
+                category: str | None,
+                catlist: list,
+                buffers: PlotBuffers) -> tuple:
+    """Return x and y values, category codes, and category names.
+
+    With a category list, only rows in those categories are returned, and
+    codes follow the order of the list. Without one, all categories found
+    in the data are used. With no category, codes and names are None.
+    """
+    xs = column_values(data, x)
+    ys = column_values(data, y)
+    if not category:
+        return xs, ys, None, None
+
+    col = data[category]
+    if catlist:
+        cat = pd.Categorical(col, categories=catlist, ordered=False)
+    elif isinstance(col.dtype, pd.CategoricalDtype):
+        cat = col.array
+    else:
+        cat = pd.Categorical(col)
+
+    codes = cat.codes
+    keep = codes >= 0
+    if not keep.all():
+        n = int(np.count_nonzero(keep))
+        xs = np.compress(keep, xs, out=buffers.array('x', n, xs.dtype))
+        ys = np.compress(keep, ys, out=buffers.array('y', n, ys.dtype))
+        codes = np.compress(keep, codes, out=buffers.array('c', n, codes.dtype))
+
+    return xs, ys, codes, list(cat.categories)
+
+
+def numeric_positions(values: np.ndarray) -> np.ndarray:
+    """Return values as float64, or row positions for non-numeric values."""
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.float64, copy=False)
+
+    return np.arange(len(values), dtype=np.float64)
+
+
+def lttb_indices(xs: np.ndarray, ys: np.ndarray, n_out: int) -> np.ndarray:
+    """Return positions of n_out points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept. Between them, each bucket of
+    points contributes the one that forms the largest triangle with the
+    point kept from the previous bucket and the mean of the next bucket.
+    """
+    n = len(xs)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = numeric_positions(xs)
+    y = ys.astype(np.float64, copy=False)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    kept = np.empty(n_out, dtype=np.intp)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+
+        area = np.abs((x[a] - next_x) * (y[start:stop] - y[a])
+                      - (x[a] - x[start:stop]) * (next_y - y[a]))
+        area[np.isnan(area)] = -1.0
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+
+    return kept
+
+
+def minmax_indices(ys: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Return positions of the min and max of ys in each of n_buckets buckets.
+
+    With one bucket per pixel column, the line drawn looks the same as
+    the line through every point.
+    """
+    n = len(ys)
+    size = n // n_buckets if n_buckets else 0
+    if size < 3:
+        return np.arange(n)
+
+    y = ys.astype(np.float64, copy=False)
+    whole = y[:size * n_buckets].reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+
+    kept = [offsets + np.argmin(whole, axis=1),
+            offsets + np.argmax(whole, axis=1),
+            np.arange(size * n_buckets, n),
+            np.array([0, n - 1])]
+
+    return np.unique(np.concatenate(kept))
+
+
+def decimate_line(xs: np.ndarray,
+                  ys: np.ndarray,
+                  budget: int,
+                  method: str = 'lttb') -> dict:
+    """Reduce a sorted line to about budget points.
+
+    Returns a dict with the x and y values to draw, the number of points
+    before decimation, and the method used ('' if not decimated). The
+    values are new arrays, not views of xs and ys.
+    """
+    n = len(xs)
+    if n <= budget:
+        return {'x': xs.copy(), 'y': ys.copy(), 'n_total': n, 'method': ''}
+
+    if method == 'minmax':
+        kept = minmax_indices(ys, budget // 2)
+    else:
+        kept = lttb_indices(xs, ys, budget)
+
+    return {'x': xs[kept], 'y': ys[kept], 'n_total': n, 'method': method}
+
+
+def decimate_scatter(xs: np.ndarray,
+                     ys: np.ndarray,
+                     codes: np.ndarray | None,
+                     budget: int,
+                     hexbin_min: int | None = None,
+                     seed: int = 0) -> dict:
+    """Reduce a scatter plot to at most budget points.
+
+    A uniform random sample keeps the relative density of points, and
+    keeps each point's category code. If hexbin_min is given, a plot
+    without categories and with at least that many points is returned
+    whole, to draw as a hexbin density plot ('method' == 'hexbin').
+    The values are new arrays, not views of xs, ys and codes.
+    """
+    n = len(xs)
+    result = {'n_total': n, 'method': ''}
+
+    if hexbin_min is not None and codes is None and n >= hexbin_min:
+        result['method'] = 'hexbin'
+    elif n > budget:
+        rng = np.random.default_rng(seed)
+        kept = np.sort(rng.choice(n, size=budget, replace=False))
+        result['x'] = xs[kept]
+        result['y'] = ys[kept]
+        result['c'] = None if codes is None else codes[kept]
+        result['method'] = 'sample'
+        return result
+
+    result['x'] = xs.copy()
+    result['y'] = ys.copy()
+    result['c'] = None if codes is None else codes.copy()
+
+    return result
+
+
+def bar_groups(data: pd.DataFrame, x: str, max_bins: int) -> tuple:
+    """Return a group code for each row (-1: no group), and group labels.
+
+    Text and categorical columns group by value. Numeric columns group by
+    value if that gives at most max_bins groups, otherwise by max_bins
+    equal-width bins.
+    """
+    col = data[x]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(), [str(c) for c in col.cat.categories]
+
+    if not pd.api.types.is_numeric_dtype(col.dtype):
+        codes, uniques = pd.factorize(col, sort=True)
+        return codes, [str(u) for u in uniques]
+
+    values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+    missing = np.isnan(values)
+    if missing.all():
+        return np.full(len(values), -1), []
+
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    is_int = col.dtype.kind in 'iu'
+
+    if is_int and hi - lo < max_bins:
+        codes = (values - lo).astype(np.intp)
+        labels = [str(int(lo) + i) for i in range(int(hi - lo) + 1)]
+    else:
+        edges = np.linspace(lo, hi, max_bins + 1)
+        codes = np.searchsorted(edges, values, side='right') - 1
+        np.clip(codes, 0, max_bins - 1, out=codes)
+        labels = [f'{edges[i]:.3g}-{edges[i + 1]:.3g}' for i in range(max_bins)]
+
+    codes[missing] = -1
+
+    return codes, labels
+
+
+def aggregate_bar(data: pd.DataFrame,
+                  x: str,
+                  y: str,
+                  agg: str,
+                  max_bins: int = 20) -> tuple:
+    """Return bar labels and heights: y reduced by agg, for each x group.
+
+    Groups with no y values are left out.
+    """
+    codes, labels = bar_groups(data, x, max_bins)
+    ngroups = len(labels)
+
+    y_values = data[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (codes >= 0) & ~np.isnan(y_values)
+    codes = codes[valid]
+    y_values = y_values[valid]
+
+    counts = np.bincount(codes, minlength=ngroups)
+    match agg:
+        case 'count':
+            heights = counts.astype(np.float64)
+        case 'sum':
+            heights = np.bincount(codes, weights=y_values, minlength=ngroups)
+        case 'mean':
+            sums = np.bincount(codes, weights=y_values, minlength=ngroups)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                heights = sums / counts
+        case 'median':
+            medians = pd.Series(y_values).groupby(codes).median()
+            heights = medians.reindex(range(ngroups)).to_numpy()
+        case _:
+            raise ValueError(f'unknown bar aggregation: {agg}')
+
+    present = counts > 0
+
+    return [lb for lb, p in zip(labels, present) if p], heights[present]
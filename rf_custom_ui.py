@@ -22,15 +22,31 @@ history:
 06-09-2024  Standardize docstrings.
 08-30-2024  Add optional callback for the Combobox in FramedCombo.
 10-26-2024  Update FramedCombo docstring
+10-18-2026  Add DataFrameText class: a Text widget that formats and displays
+            only the visible rows of a DataFrame (virtual scrolling).
+10-18-2026  Add TimingPanel class: a window of recent stage timings, from
+            an instrument.Tracer.
+10-18-2026  DataFrameText formats rows with table_text.TableFormatter, with
+            column widths measured once per dataset, instead of to_string().
+10-18-2026  Add LineText class: a read-only Text widget updated in place.
+            Only changed lines are rewritten, and tags, given as rules over
+            line ranges, are added in one call per tag. DataFrameText
+            extends it.
+10-18-2026  LineText.apply_tags() finds the lines of each rule by bisection,
+            for many rules (a statistics table per group).
 """
 """
 TODO: 
 """
 
+import bisect
+import difflib
 import sys
 import tkinter as tk
 from tkinter import ttk
 
+import table_text as tt
+
 class MyEntry(ttk.Entry):
     """
     MyEntry : Entry widget that expects a comma-separated list of strings.
@@ -180,4 +196,431 @@ class FramedCombo(ttk.Frame):
 
     def props(self):
         """Return parameter list for the FramedCombo instance."""
-        return (self.__init__.__doc__)
\ No newline at end of file
+        return (self.__init__.__doc__)
+
+
+
+class LineText(tk.Text):
+    """
+    LineText : read-only Text widget of lines, updated in place.
+
+    Extends: tk.Text
+
+    show_lines() compares new lines with those shown (difflib), and
+    deletes, inserts or replaces only the lines that differ; unchanged
+    lines keep their tags, unless they moved into or out of the lines of a
+    tag rule. Tags are set by rules over ranges of lines, and are added to
+    the changed lines with one tag_add call per tag.
+
+    Attributes
+    ----------
+    lines : list
+        the lines shown
+    tag_rules : list
+        (tag, first line, last line, extent) tuples; lines are numbered
+        from 1, and extent is 'line' or 'word' (the first word)
+
+    Methods
+    -------
+    set_tag_rules:
+        Sets the tag rules; re-tags all lines if they changed.
+    show_lines:
+        Shows new lines, rewriting only the lines that changed.
+    """
+    def __init__(self, parent, **kwargs):
+        """
+        Inits a LineText object.
+
+        Parameters
+        ----------
+        kwargs : dict
+            options passed through to tk.Text
+        """
+        super().__init__(parent, **kwargs)
+
+        self.lines = []
+        self.tag_rules = []
+
+    def set_tag_rules(self, rules: list) -> None:
+        """Set the tag rules; if they changed, re-tag all lines."""
+        rules = list(rules)
+        if rules == self.tag_rules:
+            return
+
+        for tag in {rule[0] for rule in self.tag_rules + rules}:
+            self.tag_remove(tag, '1.0', tk.END)
+        self.tag_rules = rules
+        self.apply_tags(range(1, len(self.lines) + 1))
+
+    def has_rules(self, first: int, last: int) -> bool:
+        """Return True if a tag rule covers any of lines first to last."""
+        return any(f <= last and first <= l for _, f, l, _ in self.tag_rules)
+
+    def apply_tags(self, line_numbers) -> None:
+        """Add the tags of the rules to the lines numbered line_numbers."""
+        numbers = sorted(line_numbers)
+        ranges = {}
+        for tag, first, last, extent in self.tag_rules:
+            indices = ranges.setdefault(tag, [])
+            lo = bisect.bisect_left(numbers, first)
+            hi = bisect.bisect_right(numbers, last)
+            for n in numbers[lo:hi]:
+                end = f'{n}.0 wordend' if extent == 'word' else f'{n}.end'
+                indices += [f'{n}.0', end]
+
+        for tag, indices in ranges.items():
+            if indices:
+                self.tag_add(tag, *indices)
+
+    def replace_lines(self, i1: int, i2: int, block: list, nlines: int) -> None:
+        """Replace lines [i1, i2) (from 0) of the nlines shown with block."""
+        if i2 > i1:
+            if i2 < nlines:
+                self.delete(f'{i1 + 1}.0', f'{i2 + 1}.0')
+            elif i1 > 0:
+                # the last lines, and the newline before them
+                self.delete(f'{i1}.end', 'end-1c')
+            else:
+                self.delete('1.0', 'end-1c')
+            nlines -= i2 - i1
+
+        if block:
+            text = '\n'.join(block)
+            # an empty tag list: new text does not take the tags around it
+            if i1 < nlines:
+                self.insert(f'{i1 + 1}.0', text + '\n', ())
+            elif nlines > 0:
+                self.insert('end-1c', '\n' + text, ())
+            else:
+                self.insert('1.0', text, ())
+
+    def show_lines(self, lines: list) -> None:
+        """Show lines; only the lines that differ from those shown are
+        rewritten, and tagged."""
+        self.configure(state='normal')
+
+        nlines = len(self.lines)
+        changed = []
+        moved = []
+        matcher = difflib.SequenceMatcher(None, self.lines, lines, autojunk=False)
+        # from the end, so the line numbers of earlier lines stay the same
+        for op, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            if op == 'equal':
+                if i1 != j1 and (self.has_rules(i1 + 1, i2)
+                                 or self.has_rules(j1 + 1, j2)):
+                    moved.append((j1, j2))
+                continue
+            self.replace_lines(i1, i2, lines[j1:j2], nlines)
+            nlines += (j2 - j1) - (i2 - i1)
+            changed.extend(range(j1 + 1, j2 + 1))
+
+        # unchanged lines at new line numbers are tagged again
+        for j1, j2 in moved:
+            for tag in {rule[0] for rule in self.tag_rules}:
+                self.tag_remove(tag, f'{j1 + 1}.0', f'{j2}.end')
+            changed.extend(range(j1 + 1, j2 + 1))
+
+        self.lines = list(lines)
+        self.apply_tags(changed)
+        self.configure(state='disabled')
+
+
+class DataFrameText(LineText):
+    """
+    DataFrameText : Text widget that shows a window of rows from a DataFrame.
+
+    Extends: LineText
+
+    Only the rows currently visible, plus a buffer of pre-formatted rows on
+    either side, are converted to text, by a table_text.TableFormatter.
+    Column widths are measured once per dataset, and stay fixed while
+    scrolling and for filtered views of the dataset.
+    The header line is always shown in
+    line 1, and the attached Scrollbar is driven by row position instead of
+    by the Text contents. When the window scrolls, only the rows that come
+    into view are inserted, and those that leave it are deleted.
+
+    Attributes
+    ----------
+    buffer_rows : int
+        number of rows formatted before and after the visible rows
+    frame : DataFrame
+        data currently displayed
+    top : int
+        position of the first visible row
+    header_tag : str
+        tag applied to the header line
+
+    Methods
+    -------
+    set_frame:
+        Displays a new DataFrame, starting at the first row.
+    set_scrollbar:
+        Attaches a Scrollbar, which then calls scroll_rows.
+    scroll_rows:
+        Scrollbar command: move the visible window of rows.
+    """
+    def __init__(self, parent,
+                       buffer_rows=50,
+                       **kwargs
+                ):
+        """
+        Inits a DataFrameText object.
+
+        Parameters
+        ----------
+        buffer_rows : int
+            rows formatted ahead of, and behind, the visible rows
+        kwargs : dict
+            options passed through to tk.Text
+        """
+        super().__init__(parent, **kwargs)
+
+        self.buffer_rows = buffer_rows
+        self.frame = None
+        self.formatter = None
+        self.dataset_formatter = None
+        self.top = 0
+        self.header_tag = ''
+        self.scrollbar = None
+
+        # formatted lines for rows [block_start, block_start + len(block))
+        self.header = []
+        self.block = []
+        self.block_start = 0
+
+        self.bind('<MouseWheel>', self.on_wheel)
+        self.bind('<Button-4>', self.on_wheel)
+        self.bind('<Button-5>', self.on_wheel)
+
+    def set_scrollbar(self, scrollbar):
+        """Attach a Scrollbar, and direct its commands to this widget."""
+        self.scrollbar = scrollbar
+        scrollbar.configure(command=self.scroll_rows)
+
+    def set_frame(self, frame, header_tag='bluetext', dataset=None):
+        """Display a new DataFrame, from the first row.
+
+        dataset, if given, is the DataFrame that frame's rows were selected
+        from; its column widths are measured once, and used for each frame.
+        """
+        source = frame if dataset is None else dataset
+        if (self.dataset_formatter is None
+                or self.dataset_formatter.frame is not source):
+            self.dataset_formatter = tt.TableFormatter(source)
+
+        self.frame = frame
+        self.formatter = self.dataset_formatter.view(frame)
+        self.header_tag = header_tag
+        self.top = 0
+        self.header = []
+        self.block = []
+        self.block_start = 0
+        self.render()
+
+    def visible_rows(self) -> int:
+        """Return the number of data rows that fit in the widget."""
+        return max(1, int(self.cget('height')) - max(1, len(self.header)))
+
+    def scroll_rows(self, *args):
+        """Scrollbar command: 'moveto' fraction, or 'scroll' n units|pages."""
+        if self.frame is None:
+            return
+
+        nrows = len(self.frame)
+        visible = self.visible_rows()
+
+        match args:
+            case ('moveto', fraction):
+                top = int(float(fraction) * nrows)
+            case ('scroll', number, 'pages'):
+                top = self.top + int(number) * visible
+            case ('scroll', number, _):
+                top = self.top + int(number)
+            case _:
+                return
+
+        top = max(0, min(top, nrows - visible))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def on_wheel(self, ev):
+        """Scroll rows with the mouse wheel, instead of the Text contents."""
+        if ev.num == 4 or ev.delta > 0:
+            self.scroll_rows('scroll', -3, 'units')
+        else:
+            self.scroll_rows('scroll', 3, 'units')
+
+        return 'break'
+
+    def format_block(self, start: int, stop: int) -> None:
+        """Format rows [start, stop) of the frame, and keep the lines."""
+        self.header, self.block = self.formatter.lines(start, stop)
+        self.block_start = start
+
+    def render(self) -> None:
+        """Insert the header and the visible rows into the widget."""
+        nrows = len(self.frame)
+        visible = self.visible_rows()
+        stop = min(self.top + visible, nrows)
+
+        block_stop = self.block_start + len(self.block)
+        if (not self.header or self.top < self.block_start
+                or stop > block_stop):
+            self.format_block(max(0, self.top - self.buffer_rows),
+                              min(nrows, stop + self.buffer_rows))
+
+        first = self.top - self.block_start
+        lines = self.header + self.block[first:first + (stop - self.top)]
+
+        self.set_tag_rules([(self.header_tag, 1, 1, 'line')])
+        self.show_lines(lines)
+
+        if self.scrollbar is not None:
+            if nrows:
+                self.scrollbar.set(self.top / nrows, stop / nrows)
+            else:
+                self.scrollbar.set(0.0, 1.0)
+
+
+class TimingPanel(tk.Toplevel):
+    """
+    TimingPanel : window showing recent stage timings from a Tracer.
+
+    Extends: tk.Toplevel
+
+    The window refreshes itself every refresh_ms while open. It shows, for
+    each stage, the number of runs kept and their last, mean and maximum
+    times; then the most recent runs, newest first; then the lines
+    returned by the info functions, e.g. cache summaries.
+
+    Attributes
+    ----------
+    tracer : instrument.Tracer
+        source of the stage records
+    info : list
+        functions returning a line of text each
+    refresh_ms : int
+        delay between refreshes
+    recent_rows : int
+        number of recent runs shown
+
+    Methods
+    -------
+    refresh:
+        Redraws the text, if it changed; schedules the next refresh.
+    set_recording:
+        Checkbutton callback: starts or stops recording.
+    save_trace:
+        Writes the records to a JSON trace file chosen by the user.
+    """
+    def __init__(self, parent,
+                       tracer=None,
+                       info=None,
+                       refresh_ms=500,
+                       recent_rows=15
+                ):
+        """
+        Inits a TimingPanel object.
+
+        Parameters
+        ----------
+        tracer : instrument.Tracer
+        info : list
+            functions returning a line of text each
+        refresh_ms : int
+            delay, in ms, between refreshes
+        recent_rows : int
+            number of recent runs shown
+        """
+        super().__init__(parent)
+        self.title('timing')
+
+        self.tracer = tracer
+        self.info = info if info is not None else []
+        self.refresh_ms = refresh_ms
+        self.recent_rows = recent_rows
+        self.shown = ''
+        self.after_id = None
+
+        controls = ttk.Frame(self)
+        self.record_var = tk.IntVar(value=int(tracer.enabled))
+        self.memory_var = tk.IntVar(value=int(tracer.memory))
+        ttk.Checkbutton(controls, text='record', variable=self.record_var,
+                        command=self.set_recording).pack(side='left', padx=5)
+        ttk.Checkbutton(controls, text='memory', variable=self.memory_var,
+                        command=self.set_recording).pack(side='left', padx=5)
+        ttk.Button(controls, text='save trace...',
+                   command=self.save_trace).pack(side='right', padx=5)
+        controls.pack(fill='x', pady=3)
+
+        self.text = tk.Text(self, width=78, height=30, font=('Courier New', 12),
+                            background='beige', foreground='black')
+        self.text.pack(fill='both', expand=True, padx=5, pady=5)
+
+        self.protocol('WM_DELETE_WINDOW', self.close)
+        self.refresh()
+
+    def set_recording(self) -> None:
+        """Start or stop recording, as set by the checkbuttons."""
+        if self.record_var.get():
+            self.tracer.disable()
+            self.tracer.enable(memory=bool(self.memory_var.get()))
+        else:
+            self.tracer.disable()
+
+    def save_trace(self) -> None:
+        """Ask for a file name, and write the records as a JSON trace."""
+        from tkinter import filedialog
+
+        path = filedialog.asksaveasfilename(parent=self,
+                                            defaultextension='.json',
+                                            initialfile='trace.json')
+        if path:
+            self.tracer.write_trace(path)
+
+    def panel_text(self) -> str:
+        """Return the panel text: stage summary, recent runs, info lines."""
+        def mb(nbytes):
+            return '' if nbytes is None else f'{nbytes / 2**20:.1f}'
+
+        def num(n):
+            return '' if n is None else f'{n:,}'
+
+        lines = ['recording' if self.tracer.enabled else 'not recording', '',
+                 f'{"stage":<16}{"n":>6}{"last ms":>10}{"mean ms":>10}{"max ms":>10}']
+        for name, s in self.tracer.summary().items():
+            lines.append(f'{name:<16}{s["n"]:>6}{s["last_ms"]:>10.1f}'
+                         f'{s["mean_ms"]:>10.1f}{s["max_ms"]:>10.1f}')
+
+        lines += ['', f'{"at s":>8}  {"stage":<16}{"ms":>9}{"rows in":>11}'
+                      f'{"rows out":>11}{"MB":>7}{"peak":>7}']
+        for r in reversed(self.tracer.recent(self.recent_rows)):
+            lines.append(f'{r["start"]:8.2f}  {r["name"]:<16}{r["ms"]:9.1f}'
+                         f'{num(r["rows_in"]):>11}{num(r["rows_out"]):>11}'
+                         f'{mb(r["mem"]):>7}{mb(r["peak"]):>7}')
+
+        if self.info:
+            lines.append('')
+            lines += [fn() for fn in self.info]
+
+        return '\n'.join(lines)
+
+    def refresh(self) -> None:
+        """Redraw the text if it changed; refresh again after refresh_ms."""
+        text = self.panel_text()
+        if text != self.shown:
+            self.shown = text
+            self.text.configure(state='normal')
+            self.text.delete('1.0', tk.END)
+            self.text.insert('1.0', text)
+            self.text.configure(state='disabled')
+
+        self.after_id = self.after(self.refresh_ms, self.refresh)
+
+    def close(self) -> None:
+        """Stop refreshing, and close the window. Recording goes on."""
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+        self.destroy()
@@ -0,0 +1,588 @@
+"""
+module: stats_engine.py
+
+purpose: compute and cache the statistics table shown in the statistics
+         panel.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation. Add StatsCache, an LRU cache of statistics tables.
+10-18-2026  Add Moments and agg_stats(): moment-based statistics in one
+            blocked pass per column, with mergeable (Pebay) accumulators.
+            Median uses selection (np.partition) instead of a sort.
+10-18-2026  Add RunningStats, to update statistics as chunks are loaded.
+10-18-2026  StatsCache takes a name, for use as a cache of other results.
+10-18-2026  StatsCache can be bounded by memory (max_bytes) as well as by
+            number of entries; summary() reports the hit rate.
+10-18-2026  RunningStats.update() skips columns a chunk does not have.
+10-18-2026  Add ChunkedMedian: the exact median of data read in chunks,
+            keeping only the values near the middle.
+10-18-2026  Add grouped_agg_stats(): a statistics table for each group of
+            rows, in one pass per column over rows sorted by group code.
+"""
+
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# rows per block; small enough that a block's temporaries stay in cache
+BLOCK_ROWS = 1 << 16
+
+MOMENT_STATS = ['count', 'mean', 'std', 'var', 'min', 'max', 'skew', 'kurtosis']
+
+
+class StatsCache:
+    """
+    StatsCache : bounded LRU cache of statistics tables.
+
+    Keys are built by the caller, e.g. (dataset version, canonical filter
+    spec), so that re-showing a recent filter, or all data, does not
+    recompute the statistics.
+
+    Attributes
+    ----------
+    maxsize : int
+        number of tables kept before the least recently used is evicted
+    max_bytes : int
+        memory kept before the least recently used is evicted; None for
+        no memory limit
+    nbytes : int
+        memory used by the kept values
+    hits : int
+        number of lookups found in the cache
+    misses : int
+        number of lookups that had to compute a table
+
+    Methods
+    -------
+    lookup:
+        Returns the cached value for a key, computing it on a miss.
+    clear:
+        Empties the cache, e.g. when the dataset is reloaded.
+    summary:
+        Returns a short description of cache use.
+    """
+    def __init__(self, maxsize=32, name='stats cache', max_bytes=None):
+        """
+        Inits a StatsCache object.
+
+        Parameters
+        ----------
+        maxsize : int
+            maximum number of cached tables
+        name : str
+            used in summary()
+        max_bytes : int
+            maximum memory used by cached values, or None
+        """
+        self.maxsize = maxsize
+        self.name = name
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self.entries = OrderedDict()
+
+    def lookup(self, key, compute):
+        """Return the value for key; on a miss, call compute() and keep it."""
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        value = compute()
+        self.entries[key] = value
+        self.nbytes += value_nbytes(value)
+
+        # keep at least the newest value, even if it is over max_bytes
+        while len(self.entries) > 1 and (
+                len(self.entries) > self.maxsize
+                or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            _, old = self.entries.popitem(last=False)
+            self.nbytes -= value_nbytes(old)
+
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries. Hit and miss counts are kept."""
+        self.entries.clear()
+        self.nbytes = 0
+
+    def summary(self) -> str:
+        """Return cache use, e.g. 'stats cache: 3 hits, 2 misses (60%), 2 kept'."""
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+
+        return (f'{self.name}: {self.hits} hits, {self.misses} misses '
+                f'({rate:.0%}), {len(self.entries)} kept, '
+                f'{self.nbytes / 2**20:.1f} MB')
+
+
+def value_nbytes(value) -> int:
+    """Return the memory used by a cached array or DataFrame (0 for others)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(index=True, deep=False)))
+    if isinstance(value, tuple):
+        return sum(value_nbytes(v) for v in value)
+
+    return 0
+
+
+class Moments:
+    """
+    Moments : count, mean, central moment sums, min and max of a sample.
+
+    Two Moments objects can be merged (Pebay, 2008), so statistics can be
+    accumulated over blocks or chunks of a column in a single pass.
+
+    Attributes
+    ----------
+    n : int
+        count of non-missing values
+    mean : float
+    m2, m3, m4 : float
+        sums of the 2nd, 3rd and 4th powers of deviations from the mean
+    min, max : float
+
+    Methods
+    -------
+    from_array:
+        Returns the Moments of a 1-D array, ignoring NaN.
+    merge:
+        Returns the Moments of the union of two samples.
+    value:
+        Returns one statistic, with the same definition as pandas.
+    """
+    def __init__(self, n=0, mean=0.0, m2=0.0, m3=0.0, m4=0.0,
+                       min=math.nan, max=math.nan):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.m3 = m3
+        self.m4 = m4
+        self.min = min
+        self.max = max
+
+    @classmethod
+    def from_array(cls, values: np.ndarray, block_rows: int = BLOCK_ROWS):
+        """Return the Moments of a 1-D array, block by block."""
+        total = cls()
+        for start in range(0, len(values), block_rows):
+            total = total.merge(cls.from_block(values[start:start + block_rows]))
+
+        return total
+
+    @classmethod
+    def from_block(cls, block: np.ndarray):
+        """Return the Moments of one block of values, ignoring NaN."""
+        block = np.asarray(block, dtype=np.float64)
+        total = block.sum()
+        if math.isnan(total):
+            block = block[~np.isnan(block)]
+            total = block.sum()
+
+        n = len(block)
+        if n == 0:
+            return cls()
+
+        mean = total / n
+        dev = block - mean
+        dev2 = dev * dev
+
+        return cls(n, mean,
+                   dev2.sum(),
+                   np.dot(dev2, dev),
+                   np.dot(dev2, dev2),
+                   block.min(),
+                   block.max())
+
+    def merge(self, other):
+        """Return the Moments of this sample combined with another."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+
+        na, nb = self.n, other.n
+        n = na + nb
+        delta = other.mean - self.mean
+        delta_n = delta / n
+
+        m2 = self.m2 + other.m2 + delta * delta_n * na * nb
+        m3 = (self.m3 + other.m3
+              + delta * delta_n * delta_n * na * nb * (na - nb)
+              + 3.0 * delta_n * (na * other.m2 - nb * self.m2))
+        m4 = (self.m4 + other.m4
+              + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+              + 6.0 * delta_n * delta_n * (na * na * other.m2 + nb * nb * self.m2)
+              + 4.0 * delta_n * (na * other.m3 - nb * self.m3))
+
+        return Moments(n, self.mean + delta_n * nb, m2, m3, m4,
+                       min(self.min, other.min), max(self.max, other.max))
+
+    def value(self, stat: str) -> float:
+        """Return a statistic, defined as in pandas (ddof=1, bias-adjusted)."""
+        n = self.n
+        # treat round-off as zero, as pandas does
+        m2 = 0.0 if abs(self.m2) < 1e-14 else self.m2
+        m3 = 0.0 if abs(self.m3) < 1e-14 else self.m3
+
+        match stat:
+            case 'count':
+                return float(n)
+            case 'mean':
+                return self.mean if n else math.nan
+            case 'var':
+                return m2 / (n - 1) if n > 1 else math.nan
+            case 'std':
+                return math.sqrt(m2 / (n - 1)) if n > 1 else math.nan
+            case 'min':
+                return self.min
+            case 'max':
+                return self.max
+            case 'skew':
+                if n < 3:
+                    return math.nan
+                if m2 == 0:
+                    return 0.0
+                return n * (n - 1) ** 0.5 / (n - 2) * (m3 / m2 ** 1.5)
+            case 'kurtosis' | 'kurt':
+                if n < 4:
+                    return math.nan
+                numerator = n * (n + 1) * (n - 1) * self.m4
+                denominator = (n - 2) * (n - 3) * m2 * m2
+                if abs(denominator) < 1e-14:
+                    return 0.0
+                return numerator / denominator - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+
+        raise ValueError(f'not a moment statistic: {stat}')
+
+
+def median(values: np.ndarray) -> float:
+    """Return the median, ignoring NaN, by selection rather than sorting."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return math.nan
+
+    k = n // 2
+    if n % 2:
+        return float(np.partition(values, k)[k])
+
+    part = np.partition(values, [k - 1, k])
+    return (part[k - 1] + part[k]) / 2.0
+
+
+def column_stats(values: np.ndarray, stats: list) -> list:
+    """Return the listed statistics for one column of values."""
+    moments = None
+    result = []
+    for stat in stats:
+        if stat == 'median':
+            result.append(median(values))
+        else:
+            if moments is None:
+                moments = Moments.from_array(values)
+            result.append(moments.value(stat))
+
+    return result
+
+
+def agg_stats(data: pd.DataFrame, stats_dict: dict) -> pd.DataFrame:
+    """Return a statistics table, like data.agg(stats_dict).
+
+    Moment statistics take one blocked pass per column. Statistics this
+    module does not implement are passed to pandas.
+    """
+    stat_rows = list(dict.fromkeys(st for sl in stats_dict.values() for st in sl))
+    table = {}
+
+    for column, stats in stats_dict.items():
+        values = data[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        own = [st for st in stats if st in MOMENT_STATS or st == 'median']
+        col_values = dict(zip(own, column_stats(values, own)))
+        for st in stats:
+            if st not in col_values:
+                col_values[st] = data[column].agg(st)
+
+        table[column] = [col_values.get(st, math.nan) for st in stat_rows]
+
+    return pd.DataFrame(table, index=stat_rows, dtype=np.float64)
+
+
+def group_codes(key: pd.Series) -> tuple:
+    """Return (codes, labels) for a group key column.
+
+    codes are small integers, one per row, indexing labels; -1 for a
+    missing key. A category column uses its own codes; only the
+    categories that occur are kept.
+    """
+    if isinstance(key.dtype, pd.CategoricalDtype):
+        codes = key.cat.codes.to_numpy().astype(np.intp)
+        labels = key.cat.categories
+    else:
+        codes, labels = pd.factorize(key, sort=True)
+
+    used = np.bincount(codes[codes >= 0], minlength=len(labels)) > 0
+    if not used.all():
+        new_codes = np.cumsum(used) - 1
+        codes = np.where(codes >= 0, new_codes[codes], -1)
+        labels = labels[used]
+
+    return codes, labels
+
+
+def group_moment_values(stat: str, n, mean, m2, m3, m4, low, high) -> np.ndarray:
+    """Return a moment statistic for arrays of groups, as Moments.value()."""
+    m2 = np.where(np.abs(m2) < 1e-14, 0.0, m2)
+    m3 = np.where(np.abs(m3) < 1e-14, 0.0, m3)
+
+    with np.errstate(all='ignore'):
+        match stat:
+            case 'count':
+                return n.astype(np.float64)
+            case 'mean':
+                return np.where(n > 0, mean, np.nan)
+            case 'var':
+                return np.where(n > 1, m2 / (n - 1), np.nan)
+            case 'std':
+                return np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan)
+            case 'min':
+                return low
+            case 'max':
+                return high
+            case 'skew':
+                skew = n * np.sqrt(n - 1) / (n - 2) * (m3 / m2 ** 1.5)
+                return np.where(n < 3, np.nan, np.where(m2 == 0, 0.0, skew))
+            case 'kurtosis' | 'kurt':
+                denominator = (n - 2) * (n - 3) * m2 * m2
+                kurt = (n * (n + 1) * (n - 1) * m4 / denominator
+                        - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+                return np.where(n < 4, np.nan,
+                                np.where(np.abs(denominator) < 1e-14, 0.0, kurt))
+
+    raise ValueError(f'not a moment statistic: {stat}')
+
+
+def grouped_agg_stats(data: pd.DataFrame, stats_dict: dict, by: str) -> pd.DataFrame:
+    """Return a statistics table for each group of rows with the same value of by.
+
+    The group key is coded once, and the rows are sorted by code (a radix
+    sort, for small codes); then each column takes one pass, with sums,
+    minimum and maximum over each group's run of rows (np.ufunc.reduceat),
+    and a median selection per group. Rows with a missing key are left out.
+
+    The table's index has two levels, (group, statistic); the groups are
+    sorted, and each has the statistics in the order of stats_dict.
+    """
+    stat_rows = list(dict.fromkeys(st for sl in stats_dict.values() for st in sl))
+    codes, labels = group_codes(data[by])
+    ngroups = len(labels)
+    if ngroups < 2 ** 15:
+        codes = codes.astype(np.int16)
+
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    order = order[np.searchsorted(sorted_codes, 0):]
+    bounds = np.searchsorted(sorted_codes, np.arange(ngroups + 1)) - (len(codes) - len(order))
+    starts = bounds[:-1]
+    sizes = np.diff(bounds)
+    group_of_row = np.repeat(np.arange(ngroups), sizes)
+
+    index = pd.MultiIndex.from_product([labels, stat_rows], names=[by, None])
+    if ngroups == 0:
+        return pd.DataFrame({c: [] for c in stats_dict}, index=index, dtype=np.float64)
+
+    table = {}
+    for column, stats in stats_dict.items():
+        values = data[column].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        valid = ~np.isnan(values)
+        n = np.add.reduceat(valid, starts).astype(np.int64)
+        filled = np.where(valid, values, 0.0)
+
+        with np.errstate(all='ignore'):
+            mean = np.add.reduceat(filled, starts) / n
+        dev = np.where(valid, values - mean[group_of_row], 0.0)
+        dev2 = dev * dev
+        moments = (n, mean,
+                   np.add.reduceat(dev2, starts),
+                   np.add.reduceat(dev2 * dev, starts),
+                   np.add.reduceat(dev2 * dev2, starts),
+                   np.fmin.reduceat(values, starts),
+                   np.fmax.reduceat(values, starts))
+
+        col_values = {}
+        for st in stats:
+            if st in MOMENT_STATS:
+                col_values[st] = group_moment_values(st, *moments)
+            elif st == 'median':
+                col_values[st] = np.array([median(values[b0:b1]) for b0, b1
+                                           in zip(bounds[:-1], bounds[1:])])
+            else:
+                col_values[st] = (pd.Series(values).groupby(group_of_row).agg(st)
+                                  .to_numpy(dtype=np.float64))
+
+        empty = np.full(ngroups, np.nan)
+        table[column] = np.column_stack([col_values.get(st, empty)
+                                         for st in stat_rows]).ravel()
+
+    return pd.DataFrame(table, index=index, dtype=np.float64)
+
+
+class RunningStats:
+    """
+    RunningStats : statistics accumulated chunk by chunk, e.g. while loading.
+
+    Moment statistics are exact at every update. The median needs all of
+    the data, so it is NaN until computed over the complete dataset.
+
+    Attributes
+    ----------
+    columns : list
+        numeric columns to summarize
+    moments : dict
+        Moments for each column
+
+    Methods
+    -------
+    update:
+        Adds a chunk of rows.
+    table:
+        Returns a statistics table, like agg_stats().
+    """
+    def __init__(self, columns: list):
+        """
+        Inits a RunningStats object.
+
+        Parameters
+        ----------
+        columns : list
+            names of numeric columns
+        """
+        self.columns = columns
+        self.moments = {c: Moments() for c in columns}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Merge the statistics of a chunk of rows."""
+        for c in self.columns:
+            if c not in chunk.columns:
+                continue
+            values = chunk[c].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.moments[c] = self.moments[c].merge(Moments.from_array(values))
+
+    def table(self, stats: list) -> pd.DataFrame:
+        """Return a statistics table, with rows in the order of stats."""
+        table = {}
+        for c in self.columns:
+            table[c] = [self.moments[c].value(st) if st in MOMENT_STATS else math.nan
+                        for st in stats]
+
+        return pd.DataFrame(table, index=stats, dtype=np.float64)
+
+
+class ChunkedMedian:
+    """
+    ChunkedMedian : exact median of values read in chunks, in two passes.
+
+    Pass 1 counts the values in equal-width bins between min and max (from
+    Moments). The middle value(s) are then in a known bin; pass 2 keeps
+    only the values in that bin, and the median is found among them.
+
+    Attributes
+    ----------
+    n : int
+        number of non-missing values
+    lo, hi : float
+        minimum and maximum value
+    bins : int
+        number of bins
+    counts : np.ndarray
+        values in each bin, from pass 1
+    kept : list
+        arrays of values in the middle bins, from pass 2
+
+    Methods
+    -------
+    count:
+        Pass 1: adds a chunk of values to the bin counts.
+    keep:
+        Pass 2: keeps the values of a chunk that are in the middle bins.
+    value:
+        Returns the median.
+    """
+    def __init__(self, moments: Moments,
+                       bins=1 << 16
+                ):
+        """
+        Inits a ChunkedMedian object.
+
+        Parameters
+        ----------
+        moments : Moments
+            of the same values; gives n, min and max
+        bins : int
+            number of bins; more bins keep fewer values in pass 2
+        """
+        self.n = moments.n
+        self.lo = moments.min
+        self.hi = moments.max
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.kept = []
+        self.middle = None
+
+    def bin_of(self, values: np.ndarray) -> np.ndarray:
+        """Return the bin of each value (values must not be NaN)."""
+        if self.hi <= self.lo:
+            return np.zeros(len(values), dtype=np.intp)
+
+        scaled = (values - self.lo) * (self.bins / (self.hi - self.lo))
+        return np.clip(scaled.astype(np.intp), 0, self.bins - 1)
+
+    def count(self, values: np.ndarray) -> None:
+        """Pass 1: count a chunk of values by bin."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.counts += np.bincount(self.bin_of(values), minlength=self.bins)
+
+    def middle_bins(self) -> tuple:
+        """Return the bins of the two middle values, and the count below them."""
+        if self.middle is None:
+            below = np.cumsum(self.counts)
+            k_lo, k_hi = (self.n - 1) // 2, self.n // 2
+            b_lo = int(np.searchsorted(below, k_lo, side='right'))
+            b_hi = int(np.searchsorted(below, k_hi, side='right'))
+            before = int(below[b_lo - 1]) if b_lo > 0 else 0
+            self.middle = (b_lo, b_hi, before)
+
+        return self.middle
+
+    def keep(self, values: np.ndarray) -> None:
+        """Pass 2: keep the values of a chunk that are in the middle bins."""
+        if self.n == 0:
+            return
+
+        b_lo, b_hi, _ = self.middle_bins()
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        bins = self.bin_of(values)
+        self.kept.append(values[(bins >= b_lo) & (bins <= b_hi)])
+
+    def value(self) -> float:
+        """Return the median, after both passes."""
+        if self.n == 0:
+            return math.nan
+
+        _, _, before = self.middle_bins()
+        kept = np.sort(np.concatenate(self.kept))
+        k_lo, k_hi = (self.n - 1) // 2, self.n // 2
+
+        return (kept[k_lo - before] + kept[k_hi - before]) / 2.0
@@ -0,0 +1,293 @@
+"""
+module: table_text.py
+
+purpose: format rows of a DataFrame as text, laid out like
+         DataFrame.to_string(), for the data and statistics windows.
+
+comments: DataFrame.to_string() works out column widths and float digits
+          from the rows it is given, value by value. TableFormatter works
+          them out once per dataset, from each column's range (numeric and
+          category columns) or distinct values (text columns and the
+          index), then formats any range of rows with NumPy string
+          operations, one column at a time. Widths do not change as the
+          data window scrolls. A filtered view of the dataset is formatted
+          with the dataset's widths (see view()), so it is not measured.
+          A StoreView is not read to measure it; its columns widen as rows
+          are formatted.
+
+          The layout is that of to_string(): the index left-justified,
+          then the columns right-justified, separated by one space, with a
+          leading space (or '-') before numbers and text. Floats have as
+          many decimals as the column needs, up to 6, or float_format's.
+
+          A frame with a column type not handled here (dates, floats that
+          to_string() shows in scientific notation, ...), or with named or
+          multi-level columns or index, is formatted by to_string().
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  Text columns and a non-integer index are measured with the rest
+            of the frame, so their widths do not change as rows scroll.
+"""
+
+import copy
+import re
+
+import numpy as np
+import pandas as pd
+
+# decimals shown for floats without a float_format, as pandas' display.precision
+PRECISION = 6
+
+# pandas shows floats outside this range in scientific notation
+LARGE = 1e6
+SMALL = 10.0 ** -PRECISION
+
+
+def fixed_strings(values: np.ndarray, decimals: int, sign_space: bool) -> np.ndarray:
+    """Return float values as strings with a fixed number of decimals.
+
+    Positive values get a leading space if sign_space; NaN is 'NaN'.
+    """
+    nan = np.isnan(values)
+    scale = 10 ** decimals
+    magnitude = np.abs(np.where(nan, 0.0, values))
+    scaled = np.round(magnitude * scale).astype(np.int64)
+
+    # near a half, only the exact binary value decides the rounding, as in
+    # '%.2f'; these few values are rounded by Python
+    near_half = np.flatnonzero(np.abs(magnitude * scale % 1 - 0.5) < 1e-6)
+    for i in near_half:
+        scaled[i] = int(f'{magnitude[i]:.{decimals}f}'.replace('.', ''))
+
+    text = (scaled // scale).astype('U')
+    if decimals:
+        frac = np.char.zfill((scaled % scale).astype('U'), decimals)
+        text = np.char.add(np.char.add(text, '.'), frac)
+
+    sign = np.where(np.signbit(values) & ~nan, '-', ' ' if sign_space else '')
+    text = np.char.add(sign, text)
+    if nan.any():
+        text = np.where(nan, ' NaN' if sign_space else 'NaN', text)
+
+    return text
+
+
+def decimals_needed(values: np.ndarray) -> int:
+    """Return the decimals (1 to PRECISION) that show every value, as pandas does."""
+    finite = values[np.isfinite(values)]
+    scaled = np.rint(np.abs(finite) * 10.0 ** PRECISION).astype(np.int64)
+    for decimals in range(1, PRECISION):
+        if not np.any(scaled % 10 ** (PRECISION - decimals)):
+            return decimals
+
+    return PRECISION
+
+
+class TableFormatter:
+    """
+    TableFormatter : formats rows of a DataFrame (or StoreView) as text.
+
+    Attributes
+    ----------
+    frame : DataFrame
+        the rows to format
+    float_format : str
+        format for all float values, e.g. '{:0.2f}'; None for pandas' default
+    widths : dict
+        width of each column, including its leading space
+    index_width : int
+        width of the index column
+    measured : bool
+        True if the whole frame was measured (a DataFrame); otherwise
+        columns are measured as rows are formatted
+
+    Methods
+    -------
+    view:
+        Returns a formatter for some rows of the frame, without measuring.
+    lines:
+        Returns the header lines and the lines of a range of rows.
+    text:
+        Returns a range of rows, with the header, as one string.
+    """
+    def __init__(self, frame,
+                       float_format=None
+                ):
+        """
+        Inits a TableFormatter object; measures the columns of frame.
+
+        Parameters
+        ----------
+        frame : DataFrame or chunk_store.StoreView
+        float_format : str
+            format for float values, like '{:0.2f}'; only fixed-point
+            formats ('{:0.Nf}') are used here
+        """
+        self.frame = frame
+        self.float_format = float_format
+        self.fixed_decimals = None
+        self.use_pandas = (isinstance(frame.columns, pd.MultiIndex)
+                           or frame.columns.name is not None)
+        if float_format is not None:
+            fixed = re.fullmatch(r'\{:0?\.(\d+)f\}', float_format)
+            if fixed:
+                self.fixed_decimals = int(fixed.group(1))
+            else:
+                self.use_pandas = True
+
+        self.kinds = {}
+        self.decimals = {}
+        self.widths = {}
+        self.index_width = 0
+
+        measure = isinstance(frame, pd.DataFrame)
+        self.measured = measure
+        if measure:
+            self.use_pandas |= (isinstance(frame.index, pd.MultiIndex)
+                                or frame.index.name is not None)
+            if pd.api.types.is_integer_dtype(frame.index.dtype) and len(frame):
+                self.index_width = max(len(str(frame.index.min())),
+                                       len(str(frame.index.max())))
+            elif len(frame) and not self.use_pandas:
+                labels = pd.unique(frame.index.to_numpy()).astype('U')
+                self.index_width = int(np.char.str_len(labels).max())
+
+        for c, dtype in frame.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                kind = 'category'
+            elif isinstance(dtype, np.dtype) and dtype.kind in 'iufbO':
+                kind = dtype.kind
+            else:
+                kind = None
+                self.use_pandas = True
+            self.kinds[c] = kind
+            self.decimals[c] = 1 if self.fixed_decimals is None else self.fixed_decimals
+            # numeric column names get a leading space, as in to_string()
+            self.widths[c] = len(str(c)) + (kind is not None and kind in 'iufb')
+
+            if measure and kind is not None:
+                self.measure(c, frame[c])
+
+    def measure(self, column: str, col: pd.Series) -> None:
+        """Widen a column, and add float decimals, for the values of col."""
+        kind = self.kinds[column]
+        width = self.widths[column]
+
+        if kind == 'category':
+            names = [len(str(v)) for v in col.cat.categories] or [0]
+            width = max(width, 1 + max(names))
+            if col.hasnans:
+                width = max(width, 4)
+        elif kind in 'iu':
+            if len(col):
+                lo, hi = col.min(), col.max()
+                width = max(width, 1 + max(len(str(abs(int(lo)))), len(str(abs(int(hi))))))
+        elif kind == 'b':
+            if len(col):
+                width = max(width, 6 if not col.all() else 5)
+        elif kind == 'f':
+            values = col.to_numpy(dtype=np.float64)
+            finite = values[np.isfinite(values)]
+            if finite.size:
+                lo, hi = np.abs(finite).min(), np.abs(finite).max()
+                if np.isinf(values).any() or (self.fixed_decimals is None and
+                                              (hi >= LARGE or 0 < lo < SMALL)):
+                    self.use_pandas = True
+                    return
+                if self.fixed_decimals is None:
+                    self.decimals[column] = max(self.decimals[column],
+                                                decimals_needed(finite))
+                text = fixed_strings(np.array([finite.min(), finite.max()]),
+                                     self.decimals[column],
+                                     self.fixed_decimals is None)
+                width = max(width, int(np.char.str_len(text).max()))
+            if np.isnan(values).any():
+                width = max(width, 4 if finite.size else 3)
+        else:
+            if len(col):
+                # each distinct value once
+                values = pd.Series(pd.unique(col.to_numpy(dtype=object)))
+                width = max(width, int(np.char.str_len(self.column_strings(column, values)).max()))
+
+        self.widths[column] = width
+
+    def view(self, frame) -> 'TableFormatter':
+        """Return a formatter for frame, whose rows are from this one's frame.
+
+        The widths and decimals measured here are used as they are; they
+        are enough for any of the rows.
+        """
+        view = copy.copy(self)
+        view.frame = frame
+        view.widths = dict(self.widths)
+        view.decimals = dict(self.decimals)
+
+        return view
+
+    def column_strings(self, column: str, col: pd.Series) -> np.ndarray:
+        """Return the values of col as strings, before justification."""
+        kind = self.kinds[column]
+
+        if kind == 'f':
+            if self.widths[column] < 4:
+                # a column of only NaN has no leading space
+                return np.full(len(col), 'NaN')
+            return fixed_strings(col.to_numpy(dtype=np.float64),
+                                 self.decimals[column],
+                                 self.fixed_decimals is None)
+        if kind in 'iu':
+            values = col.to_numpy()
+            text = np.char.add(np.where(values < 0, '-', ' '),
+                               np.abs(values.astype(np.int64)).astype('U'))
+            return text
+        values = col.to_numpy(dtype=object)
+        text = np.char.add(' ', values.astype('U'))
+
+        # NaN, but not None, shows as 'NaN'
+        nan = values != values
+        if nan.any():
+            text = np.where(nan, ' NaN', text)
+
+        return text
+
+    def lines(self, start: int = 0, stop: int | None = None) -> tuple:
+        """Return (header lines, row lines) for rows [start, stop)."""
+        rows = self.frame.iloc[start:stop]
+        if not isinstance(rows, pd.DataFrame):
+            rows = rows.to_frame()
+
+        if self.use_pandas or rows.empty:
+            float_format = None if self.float_format is None else self.float_format.format
+            lines = rows.to_string(float_format=float_format).split('\n')
+            nheader = len(lines) - len(rows)
+            return lines[:nheader], lines[nheader:]
+
+        # a StoreView's columns are measured as they are formatted
+        if not self.measured:
+            for c in self.kinds:
+                self.measure(c, rows[c])
+        if self.use_pandas:
+            return self.lines(start, stop)
+
+        index = rows.index.to_numpy().astype('U')
+        self.index_width = max(self.index_width, int(np.char.str_len(index).max()))
+
+        header = ' ' * self.index_width
+        text = np.char.ljust(index, self.index_width)
+        for c in rows.columns:
+            width = self.widths[c]
+            header = header + ' ' + str(c).rjust(width)
+            text = np.char.add(np.char.add(text, ' '),
+                               np.char.rjust(self.column_strings(c, rows[c]), width))
+
+        return [header], text.tolist()
+
+    def text(self, start: int = 0, stop: int | None = None) -> str:
+        """Return rows [start, stop) and the header as one string."""
+        header, rows = self.lines(start, stop)
+
+        return '\n'.join(header + rows)
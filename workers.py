@@ -0,0 +1,245 @@
+"""
+module: workers.py
+
+purpose: run data work (filter, statistics, plot preparation) in a
+         background thread, and deliver results to the Tk event loop.
+
+comments: Tkinter widgets may only be used from the thread running the
+          mainloop. Worker threads put results on a queue, which is read
+          by a root.after() callback; result callbacks run on the Tk thread.
+
+          Tasks share data caches, so by default they run one at a time.
+
+author: Russell Folks
+
+history:
+-------
+10-18-2026  creation
+10-18-2026  Add ViewPublisher: debounced notice of a new current data view.
+10-18-2026  TaskRunner takes an instrument.Profiler, to profile tasks.
+10-18-2026  TaskRunner.poll() passes errors raised by result callbacks to
+            on_error, and keeps polling after an error.
+10-18-2026  ViewPublisher publishes the dataset version with each view.
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskRunner:
+    """
+    TaskRunner : runs functions in a thread pool; results go to the Tk thread.
+
+    Each task is submitted on a named channel, e.g. 'view' or 'plot'. A
+    new task on a channel supersedes the older one: if the older task has
+    not started, it is cancelled; if it has, its result is discarded.
+
+    Attributes
+    ----------
+    root : tk.Tk
+        used to schedule result delivery
+    poll_ms : int
+        delay between checks for finished tasks
+    on_state : function
+        called with 'busy' or 'idle' when the runner's state changes
+    on_error : function
+        called with the exception, if a task's function or its callback
+        raised one
+    profiler : instrument.Profiler
+        if given, tasks run under it
+
+    Methods
+    -------
+    submit:
+        Runs a function in the background, on a channel.
+    busy:
+        Returns True if any task has not yet been delivered.
+    shutdown:
+        Cancels pending tasks and stops the pool.
+    """
+    def __init__(self, root,
+                       max_workers=1,
+                       poll_ms=20,
+                       on_state=None,
+                       on_error=None,
+                       profiler=None
+                ):
+        """
+        Inits a TaskRunner object.
+
+        Parameters
+        ----------
+        root : tk.Tk
+            the application root window
+        max_workers : int
+            number of worker threads
+        poll_ms : int
+            delay, in ms, between checks for finished tasks
+        on_state : function
+            called with 'busy' or 'idle'
+        on_error : function
+            called with an exception raised by a task
+        profiler : instrument.Profiler
+            profiles the worker threads, if given
+        """
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_state = on_state
+        self.on_error = on_error
+        self.profiler = profiler
+
+        self.pool = ThreadPoolExecutor(max_workers=max_workers,
+                                       thread_name_prefix='data-worker')
+        self.results = queue.Queue()
+
+        # channel: (generation, future) of the newest task
+        self.current = {}
+        self.generation = 0
+        self.pending = 0
+        self.polling = False
+
+    def submit(self, channel: str, fn, *args, callback=None) -> None:
+        """Run fn(*args) in the background; then callback(result) on Tk.
+
+        Supersedes any earlier task on the same channel.
+        """
+        self.generation += 1
+        generation = self.generation
+
+        if channel in self.current:
+            old_future = self.current[channel][1]
+            if old_future.cancel():
+                self.pending -= 1
+
+        if self.profiler is not None:
+            fn = self.profiler.wrap(fn)
+        future = self.pool.submit(fn, *args)
+        self.current[channel] = (generation, future)
+        self.pending += 1
+
+        future.add_done_callback(
+            lambda f: self.results.put((channel, generation, f, callback)))
+
+        if self.pending == 1 and self.on_state is not None:
+            self.on_state('busy')
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_ms, self.poll)
+
+    def poll(self) -> None:
+        """Deliver results of finished tasks; runs on the Tk thread.
+
+        An error raised by a task, or by its callback, goes to on_error.
+        Polling continues while tasks are pending, even if on_error raises.
+        """
+        try:
+            while True:
+                try:
+                    channel, generation, future, callback = self.results.get_nowait()
+                except queue.Empty:
+                    break
+
+                if future.cancelled():
+                    continue
+                self.pending -= 1
+
+                # a newer task on this channel replaces this result
+                if self.current.get(channel, (None,))[0] != generation:
+                    continue
+                del self.current[channel]
+
+                try:
+                    error = future.exception()
+                    if error is not None:
+                        raise error
+                    if callback is not None:
+                        callback(future.result())
+                except Exception as err:
+                    if self.on_error is None:
+                        raise
+                    self.on_error(err)
+        finally:
+            if self.pending > 0:
+                self.root.after(self.poll_ms, self.poll)
+            else:
+                self.polling = False
+                if self.on_state is not None:
+                    self.on_state('idle')
+
+    def busy(self) -> bool:
+        """Return True if any task has not been delivered."""
+        return self.pending > 0
+
+    def shutdown(self) -> None:
+        """Cancel tasks that have not started, and stop the worker threads."""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ViewPublisher:
+    """
+    ViewPublisher : tells subscribers when the displayed data changes.
+
+    publish() waits delay_ms before notifying; a new publish() in that
+    time replaces the pending one, so a burst of filter changes causes
+    one update.
+
+    Attributes
+    ----------
+    root : tk.Tk
+        used to schedule notices
+    delay_ms : int
+        quiet time before subscribers are notified
+    subscribers : dict
+        name: function(data, spec, version)
+
+    Methods
+    -------
+    subscribe:
+        Adds, or replaces, a named subscriber.
+    unsubscribe:
+        Removes a named subscriber.
+    publish:
+        Schedules a notice of a new view.
+    """
+    def __init__(self, root,
+                       delay_ms=250
+                ):
+        """
+        Inits a ViewPublisher object.
+
+        Parameters
+        ----------
+        root : tk.Tk
+            the application root window
+        delay_ms : int
+            quiet time, in ms, before subscribers are notified
+        """
+        self.root = root
+        self.delay_ms = delay_ms
+        self.subscribers = {}
+        self.after_id = None
+
+    def subscribe(self, name: str, callback) -> None:
+        """Call callback(data, spec, version) for each new view, under a name."""
+        self.subscribers[name] = callback
+
+    def unsubscribe(self, name: str) -> None:
+        """Stop notifying the named subscriber."""
+        self.subscribers.pop(name, None)
+
+    def publish(self, data, spec: tuple, version: int) -> None:
+        """Notify subscribers of a new view, after delay_ms of no others.
+
+        version is the data_version of the dataset the view is from.
+        """
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+
+        self.after_id = self.root.after(self.delay_ms, self.notify,
+                                        data, spec, version)
+
+    def notify(self, data, spec: tuple, version: int) -> None:
+        """Call each subscriber with the view."""
+        self.after_id = None
+        for callback in list(self.subscribers.values()):
+            callback(data, spec, version)